@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from backend.service.catalog import CatalogServices, MAX_PAGE_SIZE
+from backend.logger.log_utils import setup_logger
+from typing import Optional
+
+catalog_api = APIRouter(tags=["Table Catalog APIs"])
+
+api_logger = setup_logger(name="catalog_api")
+
+
+@catalog_api.post("/catalogfetch_tables")
+async def fetch_tables(
+        document_id: Optional[str] = Query(None, description="Only tables extracted from this document."),
+        task_id: Optional[str] = Query(None, description="Only tables produced by this task."),
+        column: Optional[str] = Query(None, description="Only tables having a column with this exact name."),
+        page: int = Query(1, ge=1, description="1-based page number."),
+        page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Entries per page.")):
+    try:
+        catalog_page = await CatalogServices().list_tables(
+            document_id=document_id,
+            task_id=task_id,
+            column=column,
+            page=page,
+            page_size=page_size
+        )
+        return JSONResponse(content={"data": catalog_page, "success": True})
+
+    except Exception as e:
+        api_logger.exception(f'Exception in catalog fetch: {e}')
+        raise HTTPException(status_code=500, detail='Internal Server Error while fetching table catalog.')
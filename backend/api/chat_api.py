@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from backend.service.chat_model import ChatServices
+from backend.service.search import SearchServices
+from backend.logger.log_utils import setup_logger
 import asyncio
-from typing import List
+from typing import List, Optional
 
 chat_api = APIRouter(tags=["LLM Chat APIs"])
 
+api_logger = setup_logger(name="chat_api")
+
 
 # Define the request body structure
 class ChatQuery:
@@ -16,11 +20,18 @@ class ChatQuery:
 @chat_api.post("/chat_llm_query")
 async def chat_llm_query(
         table_names: List[str] = Query(..., description="List of table names (e.g., doc_id_table_1) to query."),
-        query: str = Query(..., description="The natural language question for the LLM.")):
+        query: str = Query(..., description="The natural language question for the LLM."),
+        search: Optional[str] = Query(None, description="Only send tables whose cells match this search text.")):
     if not table_names or not query:
         raise HTTPException(status_code=400, detail="Missing table names or user query.")
 
     try:
+        if search and search.strip():
+            # Narrow the context via the search index; keep the full list if nothing matches
+            matched_tables = await SearchServices().matching_tables(search.strip(), table_names)
+            if matched_tables:
+                table_names = matched_tables
+
         # Since ChatServices.get_llm_response is async and internally uses to_thread, we await it directly.
         llm_response = await ChatServices().get_llm_response(
             table_names=table_names,
@@ -30,5 +41,5 @@ async def chat_llm_query(
         return JSONResponse(content={"response": llm_response, "success": True})
 
     except Exception as e:
-        print(f'Exception in chat LLM query: {e}')
+        api_logger.exception(f'Exception in chat LLM query: {e}')
         raise HTTPException(status_code=500, detail=f'LLM Chat API error: {e}')
\ No newline at end of file
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
-from backend.service.document import DocumentServices
+from backend.service.document import DocumentServices, UPLOAD_DIRECTORY
+from backend.logger.log_utils import setup_logger
 import os
 
 document_api = APIRouter(tags=["Document Processing APIs"])
 
-UPLOAD_DIRECTORY = "uploaded_pdfs"
+api_logger = setup_logger(name="document_api")
 
 
 @document_api.post("/documentupload_pdf")
@@ -43,7 +44,7 @@ async def upload_pdf(file: UploadFile = File(...)):
         raise
     except Exception as e:
         # General exception handler for internal server errors
-        print(f'Exception in uploading document: {e}')
+        api_logger.exception(f'Exception in uploading document: {e}')
         raise HTTPException(
             status_code=500,
             detail="Internal Server Error during document processing."
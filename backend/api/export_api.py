@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from backend.service.export import ExportServices, ExportError, EXPORT_FORMATS
+from backend.logger.log_utils import setup_logger
+from typing import Optional
+import asyncio
+import re
+
+export_api = APIRouter(tags=["Export APIs"])
+
+api_logger = setup_logger(name="export_api")
+
+
+def _attachment_header(filename: str) -> str:
+    """Content-Disposition for a download; anything but [A-Za-z0-9_.-] is replaced so the header stays valid."""
+    return f'attachment; filename="{re.sub(r"[^A-Za-z0-9_.-]", "_", filename)}"'
+
+
+@export_api.post("/exportstream_tables")
+async def export_tables(
+        table_name: Optional[str] = Query(None, description="Export this single table."),
+        document_id: Optional[str] = Query(None, description="Export every table of this document."),
+        task_id: Optional[str] = Query(None, description="Export every table produced by this task."),
+        format: str = Query("csv", description="One of: csv, parquet, arrow."),
+        archive: bool = Query(False, description="Wrap the output in a zip archive (always on for multiple tables).")):
+    if not (table_name or document_id or task_id):
+        raise HTTPException(status_code=400, detail='Provide a table_name, document_id or task_id to export.')
+
+    export_format = format.lower()
+    services = ExportServices()
+
+    try:
+        services.check_format(export_format)
+        # Catalog lookup is a blocking DB call
+        table_names = await asyncio.to_thread(
+            services.resolve_tables,
+            table_name=table_name,
+            document_id=document_id,
+            task_id=task_id
+        )
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        api_logger.exception(f'Exception in export: {e}')
+        raise HTTPException(status_code=500, detail='Internal Server Error while preparing export.')
+
+    # StreamingResponse iterates these sync generators in a worker thread, chunk by chunk
+    if archive or len(table_names) > 1:
+        stem = table_name or document_id or task_id
+        return StreamingResponse(
+            services.stream_zip(table_names, export_format),
+            media_type="application/zip",
+            headers={"Content-Disposition": _attachment_header(f"{stem}_{export_format}.zip")}
+        )
+
+    extension = EXPORT_FORMATS[export_format]['extension']
+    return StreamingResponse(
+        services.stream_table(table_names[0], export_format),
+        media_type=EXPORT_FORMATS[export_format]['media_type'],
+        headers={"Content-Disposition": _attachment_header(f"{table_names[0]}.{extension}")}
+    )
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from backend.service.search import SearchServices, MAX_PAGE_SIZE
+from backend.logger.log_utils import setup_logger
+from typing import Optional
+
+search_api = APIRouter(tags=["Search APIs"])
+
+api_logger = setup_logger(name="search_api")
+
+
+@search_api.post("/search")
+async def search_tables(
+        q: str = Query(..., min_length=1, description="Text to search for in extracted table cells."),
+        document_id: Optional[str] = Query(None, description="Only search tables of this document."),
+        page: int = Query(1, ge=1, description="1-based page number."),
+        page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Matches per page.")):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail='Empty search query.')
+
+    try:
+        results = await SearchServices().search(
+            query=q.strip(),
+            document_id=document_id,
+            page=page,
+            page_size=page_size
+        )
+        return JSONResponse(content={"data": results, "success": True})
+
+    except Exception as e:
+        api_logger.exception(f'Exception in table search: {e}')
+        raise HTTPException(status_code=500, detail='Internal Server Error while searching tables.')
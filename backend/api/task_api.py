@@ -1,38 +1,73 @@
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Header
+from fastapi.responses import JSONResponse, Response as HTTPResponse
 from backend.service.task import TaskServices
+from backend.service.scheduler import PRIORITY_CLASSES, DEFAULT_PRIORITY, DEFAULT_TENANT
 from backend.utils.util import Response  # Imported for type hint reference
+from typing import Optional
+from backend.logger.log_utils import setup_logger
 
 task_api = APIRouter(tags=["Task Processing APIs"])
 
+api_logger = setup_logger(name="task_api")
+
 
 @task_api.post("/tasktrigger_task")
-async def trigger_task(docs: str = Query(..., description="Document ID to process")):
+async def trigger_task(
+        docs: str = Query(..., description="Document ID to process"),
+        tenant: str = Query(DEFAULT_TENANT, max_length=255, description="Tenant the task is fair-shared under."),
+        priority: str = Query(DEFAULT_PRIORITY, description="Priority class: high, normal or low.")):
     if not docs:
         raise HTTPException(status_code=400, detail='No docs id provided.')
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f'Invalid priority. Use one of: {", ".join(PRIORITY_CLASSES)}.')
 
     try:
-        task_response_object: Response = await TaskServices().create(docs)
+        task_response_object: Response = await TaskServices().create(docs, tenant=tenant, priority=priority)
         task_id = task_response_object.Id
 
         return JSONResponse(content={"id": task_id, "success": True})
 
     except Exception as e:
-        print(f'Exception in task trigger: {e}')
+        api_logger.exception(f'Exception in task trigger: {e}')
         raise HTTPException(status_code=500, detail='Internal Server Error while triggering task.')
 
 
+@task_api.get("/taskfetch_output")
 @task_api.post("/taskfetch_output")
-async def fetch_output(task_id: str = Query(..., description="Task ID to fetch output for")):
+async def fetch_output(
+        task_id: str = Query(..., description="Task ID to fetch output for"),
+        if_none_match: Optional[str] = Header(None, description="ETag of a previous response for this task.")):
     if not task_id:
         raise HTTPException(status_code=400, detail=f'No taskid provided.')
 
     try:
-        output_data = await TaskServices().fetch(
+        output_data, etag = await TaskServices().fetch_with_etag(
             task_id=task_id
         )
-        return JSONResponse(content={"data": output_data, "success": True})
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        # Unchanged since the client's last poll: skip serializing the output
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+            return HTTPResponse(status_code=304, headers=headers)
+
+        return JSONResponse(content={"data": output_data, "success": True}, headers=headers)
+
+    except Exception as e:
+        api_logger.exception(f'Exception in task fetch: {e}')
+        raise HTTPException(status_code=500, detail='Internal Server Error while fetching task output.')
+
+
+@task_api.post("/taskcancel_task")
+async def cancel_task(task_id: str = Query(..., description="Task ID to cancel")):
+    if not task_id:
+        raise HTTPException(status_code=400, detail='No taskid provided.')
+
+    try:
+        cancel_result = await TaskServices().cancel(task_id=task_id)
+        return JSONResponse(content={"data": cancel_result, "success": True})
 
     except Exception as e:
-        print(f'Exception in task fetch: {e}')
-        raise HTTPException(status_code=500, detail='Internal Server Error while fetching task output.')
\ No newline at end of file
+        if "Task not found" in str(e):
+            raise HTTPException(status_code=404, detail=f'Task not found: {task_id}')
+        api_logger.exception(f'Exception in task cancel: {e}')
+        raise HTTPException(status_code=500, detail='Internal Server Error while cancelling task.')
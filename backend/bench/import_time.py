@@ -0,0 +1,61 @@
+"""
+Cold-start benchmark for API workers.
+
+Imports backend.main in fresh interpreters and reports import wall time, peak RSS,
+and whether any of the heavy extraction modules got loaded. Run from the repo root:
+
+    python -m backend.bench.import_time --runs 5 --strict
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that must only be loaded by extraction worker processes
+HEAVY_MODULES = ("camelot", "pandas", "cv2", "ghostscript", "pyarrow")
+
+PROBE = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules),
+}}))
+"""
+
+
+def run_probe() -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True, text=True, check=True
+    )
+    # The last stdout line is the probe result; earlier lines are startup prints
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold imports to measure.")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if heavy modules are imported.")
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(args.runs)]
+    seconds = [r["import_seconds"] for r in results]
+    rss = [r["max_rss_mb"] for r in results]
+    heavy = sorted({m for r in results for m in r["heavy_modules"]})
+
+    print(f"runs:           {args.runs}")
+    print(f"import time:    median {statistics.median(seconds):.3f}s  min {min(seconds):.3f}s  max {max(seconds):.3f}s")
+    print(f"peak RSS:       median {statistics.median(rss):.1f} MB")
+    print(f"heavy modules:  {', '.join(heavy) if heavy else 'none'}")
+
+    if args.strict and heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
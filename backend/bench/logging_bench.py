@@ -0,0 +1,82 @@
+"""
+Per-call cost of the queue-based logger versus a synchronous StreamHandler.
+
+Each scenario writes JSON to /dev/null, then to a sink that blocks ~0.2 ms per
+write (a slow terminal or log pipe). Run from the repo root:
+
+    python -m backend.bench.logging_bench --calls 100000
+"""
+import argparse
+import io
+import logging
+import os
+import time
+from backend.logger.log_utils import (setup_logger, configure_logging, bind_correlation_id,
+                                      CorrelationIdFilter, JsonFormatter, _NonBlockingQueueHandler)
+
+
+class SlowStream:
+    """Stream whose writes block, like stdout attached to a slow consumer."""
+
+    def __init__(self, delay: float = 0.0002):
+        self.delay = delay
+
+    def write(self, data):
+        time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+def time_calls(log_call, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        log_call(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run_scenarios(sink, calls: int) -> None:
+    # Baseline: formatting and writing happen in the calling thread
+    sync_logger = logging.getLogger("bench_sync")
+    sync_logger.propagate = False
+    sync_logger.setLevel(logging.INFO)
+    sync_logger.handlers = []
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(CorrelationIdFilter())
+    sync_logger.addHandler(handler)
+
+    configure_logging(stream=sink, level="INFO", fmt="json")
+    queued_logger = setup_logger(name="bench_queued")
+
+    scenarios = {
+        "sync StreamHandler": lambda i: sync_logger.info("page %d processed", i),
+        "queued": lambda i: queued_logger.info("page %d processed", i),
+        "queued, rate limited": lambda i: queued_logger.info("page %d processed", i, extra={"rate_key": "bench"}),
+        "queued, below level": lambda i: queued_logger.debug("page %d processed", i),
+    }
+
+    # The slow sink would take minutes for the synchronous baseline at full call count
+    sync_calls = calls if isinstance(sink, io.TextIOBase) else min(calls, 2_000)
+
+    with bind_correlation_id("bench"):
+        for name, log_call in scenarios.items():
+            n = sync_calls if name.startswith("sync") else calls
+            dropped_before = _NonBlockingQueueHandler.dropped_total
+            cost = time_calls(log_call, n)
+            dropped = _NonBlockingQueueHandler.dropped_total - dropped_before
+            print(f"{name:<24} {cost:8.2f} us/call  ({n} calls, {dropped} dropped on full queue)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000, help="Log calls per scenario.")
+    args = parser.parse_args()
+
+    for sink_name, sink in (("/dev/null", open(os.devnull, "w")), ("slow sink", SlowStream())):
+        print(f"--- {sink_name} ---")
+        run_scenarios(sink, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,11 @@
 from fastapi import Depends
-import backend.db.models as models
-from backend.db.connection import engine, sessionlocal
+from backend.db.connection import sessionlocal
 from typing import Annotated
 from sqlalchemy.orm import Session
 
 
-# --- Database Initialization ---
-try:
-    # This creates the tables if they don't exist. Added try/except for resilience.
-    models.Base.metadata.create_all(bind=engine)
-except Exception as e:
-    print(f"Warning: Could not create database tables on startup. Error: {e}")
+# Schema creation lives in backend/db/init_db.py and runs as an explicit
+# migration/startup step, not as a side effect of importing this module.
 
 
 def get_DB():
@@ -27,4 +22,4 @@ def get_DB():
 
 
 # Type hint for the database dependency injection in FastAPI routers
-db_dependency = Annotated[Session, Depends(get_DB)]
\ No newline at end of file
+db_dependency = Annotated[Session, Depends(get_DB)]
@@ -0,0 +1,105 @@
+import os
+import re
+import backend.db.models as models
+from backend.db.connection import engine
+from sqlalchemy import text
+from backend.logger.log_utils import setup_logger
+
+db_logger = setup_logger(name="db_init")
+
+# ALTER TABLE / CREATE INDEX take table locks even when IF NOT EXISTS turns them into no-ops,
+# and a waiting lock blocks every later query on the table. Statements only run when the
+# column/index is missing, and give up after this long instead of queueing behind readers.
+SCHEMA_LOCK_TIMEOUT = os.getenv('DB_SCHEMA_LOCK_TIMEOUT', '5s')
+if not re.fullmatch(r'[0-9]+(ms|s|min)?', SCHEMA_LOCK_TIMEOUT):
+    SCHEMA_LOCK_TIMEOUT = '5s'
+
+# create_all does not add columns to existing tables; apply additive column changes here.
+# (table, column, DDL)
+ADDED_COLUMNS = [
+    ('Task', 'tenant', 'ALTER TABLE "Task" ADD COLUMN IF NOT EXISTS tenant VARCHAR(255) NOT NULL DEFAULT \'default\''),
+    ('Task', 'priority', 'ALTER TABLE "Task" ADD COLUMN IF NOT EXISTS priority VARCHAR(20) NOT NULL DEFAULT \'normal\''),
+    ('TableProfile', 'summary_rows',
+     'ALTER TABLE "TableProfile" ADD COLUMN IF NOT EXISTS summary_rows INTEGER NOT NULL DEFAULT 0'),
+]
+# (index name, DDL)
+ADDED_INDEXES = [
+    ('ix_Task_tenant', 'CREATE INDEX IF NOT EXISTS "ix_Task_tenant" ON "Task" (tenant)'),
+]
+
+# Optional: trigram index for substring search. Needs the pg_trgm extension, which the app
+# role may not be allowed to create; search uses full-text matching only without it.
+TRIGRAM_EXTENSION = 'CREATE EXTENSION IF NOT EXISTS pg_trgm'
+TRIGRAM_INDEX = ('ix_TableRowIndex_content_trgm',
+                 'CREATE INDEX IF NOT EXISTS "ix_TableRowIndex_content_trgm" ON "TableRowIndex" USING gin (content gin_trgm_ops)')
+
+
+def _column_exists(connection, table: str, column: str) -> bool:
+    return connection.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+    ), {'table': table, 'column': column}).first() is not None
+
+
+def _index_exists(connection, name: str) -> bool:
+    return connection.execute(text(
+        "SELECT 1 FROM pg_indexes WHERE schemaname = current_schema() AND indexname = :name"
+    ), {'name': name}).first() is not None
+
+
+def _trigram_installed(connection) -> bool:
+    return connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+def _run_statement(statement: str, exists=None) -> bool:
+    """
+    Runs one DDL statement in its own transaction with a lock timeout, unless exists(connection)
+    reports it is already applied. A failure is logged and does not affect other statements.
+    """
+    try:
+        with engine.begin() as connection:
+            if exists is not None and exists(connection):
+                return True
+            # SET LOCAL only lasts for this transaction; the value is format-checked at import
+            connection.execute(text(f"SET LOCAL lock_timeout = '{SCHEMA_LOCK_TIMEOUT}'"))
+            connection.execute(text(statement))
+        return True
+    except Exception as e:
+        db_logger.warning(f"Schema statement failed: {statement}. Error: {e}")
+        return False
+
+
+def create_schema() -> bool:
+    """
+    Creates missing tables and applies additive column migrations.
+    Run once per deployment (python -m backend.db.init_db) or at app startup,
+    never at import time.
+
+    Each step runs independently: a failing step is logged and does not keep the
+    others (in particular the column migrations) from being applied.
+    """
+    ok = True
+    try:
+        # This creates the tables if they don't exist.
+        models.Base.metadata.create_all(bind=engine)
+    except Exception as e:
+        db_logger.warning(f"Could not create database tables. Error: {e}")
+        ok = False
+
+    for table, column, statement in ADDED_COLUMNS:
+        ok = _run_statement(statement, lambda c, t=table, col=column: _column_exists(c, t, col)) and ok
+    for name, statement in ADDED_INDEXES:
+        ok = _run_statement(statement, lambda c, n=name: _index_exists(c, n)) and ok
+
+    name, statement = TRIGRAM_INDEX
+    if not (_run_statement(TRIGRAM_EXTENSION, _trigram_installed)
+            and _run_statement(statement, lambda c: _index_exists(c, name))):
+        db_logger.warning("pg_trgm is unavailable; substring search runs without the trigram index.")
+
+    if ok:
+        db_logger.info("Database schema is up to date.")
+    return ok
+
+
+if __name__ == "__main__":
+    create_schema()
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, ForeignKey, String, DateTime, JSON, func
+from sqlalchemy import (Column, ForeignKey, String, DateTime, JSON, Integer, BigInteger, Float, Text, Index,
+                        Computed, func)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from backend.db.connection import Base
 
 
@@ -10,7 +12,7 @@ class DocumentTable(Base):
     storage_path = Column(String(2048), nullable=False)
     created_ts = Column(DateTime(timezone=True), server_default=func.now())
     # Added onupdate for automatic timestamp updatingA
-    modified_ts = Column(DateTime(timezone=True), server_default=func.Anow(), onupdate=func.now())
+    modified_ts = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class TaskTable(Base):
@@ -24,9 +26,89 @@ class TaskTable(Base):
     # Added length constraint and default status
     status = Column(String(50), default='PENDING', nullable=False)
 
+    # Scheduling attributes: fair-share key and priority class
+    tenant = Column(String(255), default='default', server_default='default', index=True, nullable=False)
+    priority = Column(String(20), default='normal', server_default='normal', nullable=False)
+
     # Removed index on JSON column (inefficient)
     output = Column(JSON, default={}, nullable=False)
 
     created_ts = Column(DateTime(timezone=True), server_default=func.now())
     # Added onupdate for automatic timestamp updating
-    modified_ts = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    modified_ts = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TableCatalogTable(Base):
+    """
+    One row per extracted table: where it came from and what its schema looks like,
+    so tables can be looked up without introspecting information_schema.
+    """
+    __tablename__ = 'TableCatalog'
+    __table_args__ = (
+        # GIN index so "tables having column X" is an index lookup (column_names @> ARRAY[...])
+        Index('ix_TableCatalog_column_names', 'column_names', postgresql_using='gin'),
+    )
+
+    id = Column(String(37), primary_key=True, index=True, nullable=False)
+    table_name = Column(String(255), unique=True, index=True, nullable=False)
+    docID = Column(String(37), ForeignKey('Document.id'), index=True, nullable=False)
+    taskID = Column(String(37), ForeignKey('Task.id'), index=True, nullable=False)
+
+    page_number = Column(Integer, nullable=True)
+    flavor = Column(String(50), nullable=True)
+    n_rows = Column(Integer, default=0, nullable=False)
+    n_cols = Column(Integer, default=0, nullable=False)
+
+    # Ordered list of {"name": ..., "type": ...}; column_names duplicates the names for indexing
+    columns = Column(JSON, default=[], nullable=False)
+    column_names = Column(ARRAY(String), default=[], nullable=False)
+
+    # Camelot parsing report scores
+    accuracy = Column(Float, nullable=True)
+    whitespace = Column(Float, nullable=True)
+
+    created_ts = Column(DateTime(timezone=True), server_default=func.now())
+    modified_ts = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TableRowIndexTable(Base):
+    """
+    Full-text search index over extracted cells, one row per extracted table row.
+    """
+    __tablename__ = 'TableRowIndex'
+    __table_args__ = (
+        Index('ix_TableRowIndex_search_vector', 'search_vector', postgresql_using='gin'),
+        # The trigram index on content needs pg_trgm and is created by init_db when available
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(String(255), index=True, nullable=False)
+    docID = Column(String(37), ForeignKey('Document.id'), index=True, nullable=False)
+    taskID = Column(String(37), ForeignKey('Task.id'), index=True, nullable=False)
+    row_number = Column(Integer, nullable=False)
+
+    # Cell values of the row joined with ' | '
+    content = Column(Text, nullable=False)
+    # 'simple' config: no stemming or stop words, names and identifiers are kept verbatim
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('simple', content)", persisted=True))
+
+
+class TableProfileTable(Base):
+    """
+    Column statistics of an extracted table, computed once at extraction time so simple
+    aggregate questions can be answered (or summarized for the LLM) without reading rows.
+    """
+    __tablename__ = 'TableProfile'
+
+    table_name = Column(String(255), primary_key=True, nullable=False)
+    docID = Column(String(37), ForeignKey('Document.id'), index=True, nullable=False)
+    taskID = Column(String(37), ForeignKey('Task.id'), index=True, nullable=False)
+    row_count = Column(Integer, default=0, nullable=False)
+    # Rows labelled subtotal/tax/total; numeric stats exclude them
+    summary_rows = Column(Integer, default=0, server_default='0', nullable=False)
+
+    # Ordered list of per-column stats, see ProfileServices.compute_profile
+    columns = Column(JSON, default=[], nullable=False)
+
+    created_ts = Column(DateTime(timezone=True), server_default=func.now())
+    modified_ts = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
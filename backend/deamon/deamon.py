@@ -1,8 +1,11 @@
 from backend.db.connection import sessionlocal
+from backend.logger.log_utils import setup_logger
 import psycopg2
 import time
-from datetime import datetime
 import os
+import argparse
+
+daemon_logger = setup_logger(name="daemon")
 
 # --- Status Constants ---
 STATUS_NOT_STARTED = 'NOT_STARTED'
@@ -13,15 +16,20 @@ STATUS_FAILURE = 'FAILURE'
 # --- Scheduling Interval (5 minutes) ---
 POLLING_INTERVAL_SECONDS = 3 * 60  # Set to 300 seconds (5 minutes)
 
+# --- Retention Interval (6 hours by default) ---
+RETENTION_INTERVAL_SECONDS = int(os.getenv('RETENTION_INTERVAL_SECONDS', 6 * 60 * 60))
+# Retention deletes data, so the periodic pass is opt-in
+RETENTION_ENABLED = os.getenv('RETENTION_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
 
 def run_scheduled_check():
     """
     Performs the core daemon logic: searches for NOT_STARTED tasks and updates them.
     """
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] --- DAEMON CHECK START ---")
+    daemon_logger.info("--- DAEMON CHECK START ---")
     conn = sessionlocal()
     if not conn:
-        print("Skipping check due to database connection error.")
+        daemon_logger.error("Skipping check due to database connection error.")
         return
 
     try:
@@ -37,10 +45,10 @@ def run_scheduled_check():
             pending_tasks = cur.fetchall()
 
             if not pending_tasks:
-                print("No tasks found with status 'NOT_STARTED'.")
+                daemon_logger.info("No tasks found with status 'NOT_STARTED'.")
                 return
 
-            print(f"Found {len(pending_tasks)} task(s) to transition to '{STATUS_IN_PROGRESS}'.")
+            daemon_logger.info(f"Found {len(pending_tasks)} task(s) to transition to '{STATUS_IN_PROGRESS}'.")
 
             # 2. Update the status of the selected tasks
             task_ids_to_update = [task[0] for task in pending_tasks]
@@ -61,43 +69,77 @@ def run_scheduled_check():
             # 3. Commit the transaction to make changes permanent
             conn.commit()
 
-            print(f"SUCCESS: Updated {len(task_ids_to_update)} task(s) to '{STATUS_IN_PROGRESS}'.")
+            daemon_logger.info(f"SUCCESS: Updated {len(task_ids_to_update)} task(s) to '{STATUS_IN_PROGRESS}'.")
 
     except psycopg2.Error as e:
-        print(f"DATABASE ERROR during check: {e}")
+        daemon_logger.error(f"DATABASE ERROR during check: {e}")
         conn.rollback()  # Roll back the transaction if any error occurred
     finally:
         conn.close()
 
 
+def run_retention():
+    """
+    Runs one retention pass: drops orphaned/superseded extraction tables, expires old
+    documents and archives unreferenced PDFs (see RetentionServices).
+    """
+    # Imported here so the polling check does not depend on the retention module
+    from backend.service.retention import RetentionServices
+
+    daemon_logger.info("--- RETENTION PASS START ---")
+    return RetentionServices().run()
+
+
+def _run_job(name, job):
+    # A failing job must not stop the daemon loop or the other jobs
+    try:
+        job()
+    except Exception as e:
+        daemon_logger.exception(f"Daemon job '{name}' failed: {e}")
+
+
 def start_daemon():
     """
     The main scheduler loop using time.sleep to simulate scheduled polling.
     """
-    print("\n========================================================")
-    print(f"PostgreSQL Task Scheduler Daemon Initialized.")
-    print(f"Polling Interval: {POLLING_INTERVAL_SECONDS} seconds ({POLLING_INTERVAL_SECONDS / 60} minutes)")
-    print(f"NOTE: Using a DEMO_INTERVAL of {POLLING_INTERVAL_SECONDS} seconds for immediate viewing.")
-    print("========================================================\n")
+    daemon_logger.info("PostgreSQL Task Scheduler Daemon Initialized.")
+    daemon_logger.info(f"Polling Interval: {POLLING_INTERVAL_SECONDS} seconds ({POLLING_INTERVAL_SECONDS / 60} minutes)")
 
     # In a real environment, you would use POLLING_INTERVAL_SECONDS
     # For this demo, we use DEMO_INTERVAL (10 seconds)
     actual_interval = POLLING_INTERVAL_SECONDS
+    # The first pass runs one interval after start, never right after a deploy
+    next_retention_at = time.monotonic() + RETENTION_INTERVAL_SECONDS
+    if RETENTION_ENABLED:
+        daemon_logger.info(f"Retention Interval: {RETENTION_INTERVAL_SECONDS} seconds")
+    else:
+        daemon_logger.info("Retention is disabled (set RETENTION_ENABLED=true to enable).")
 
     try:
         while True:
             # Execute the daemon logic
-            run_scheduled_check()
+            _run_job("scheduled_check", run_scheduled_check)
+
+            if RETENTION_ENABLED and RETENTION_INTERVAL_SECONDS > 0 and time.monotonic() >= next_retention_at:
+                _run_job("retention", run_retention)
+                next_retention_at = time.monotonic() + RETENTION_INTERVAL_SECONDS
 
-            print(f"Sleeping for {actual_interval} seconds...")
+            daemon_logger.debug(f"Sleeping for {actual_interval} seconds...")
             # Pause execution until the next check
             time.sleep(actual_interval)
 
     except KeyboardInterrupt:
-        print("\nDaemon interrupted by user. Shutting down gracefully.")
+        daemon_logger.info("Daemon interrupted by user. Shutting down gracefully.")
     except Exception as e:
-        print(f"\nCRITICAL ERROR: {e}")
+        daemon_logger.exception(f"CRITICAL ERROR: {e}")
 
 
 if __name__ == "__main__":
-    start_daemon()
+    parser = argparse.ArgumentParser(description="TableForge maintenance daemon.")
+    parser.add_argument("--retention-once", action="store_true", help="Run a single retention pass and exit.")
+    args = parser.parse_args()
+
+    if args.retention_once:
+        run_retention()
+    else:
+        start_daemon()
@@ -1,24 +1,226 @@
+import atexit
+import contextlib
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Optional
 
+# --- Configuration (from environment) ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # 'json' or 'text'
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10_000))
+# How long a WARNING-or-above record waits for room in a full queue before it is dropped
+LOG_BLOCKING_PUT_SECONDS = float(os.getenv("LOG_BLOCKING_PUT_SECONDS", 0.5))
+# Max records per second for each rate_key (see RateLimitFilter)
+LOG_RATE_PER_KEY = int(os.getenv("LOG_RATE_PER_KEY", 5))
 
-def setup_logger(name="Multi-Agent-logger"):
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] [%(module)s:%(lineno)d] [%(correlation_id)s] --- %(message)s"
+
+# Request id or task id of the work currently being done; copied into asyncio tasks and to_thread calls
+correlation_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
+
+
+def get_correlation_id() -> Optional[str]:
+    return correlation_id_var.get()
+
+
+@contextlib.contextmanager
+def bind_correlation_id(value: Optional[str]):
+    """Tags every log record emitted inside the block with the given correlation id."""
+    token = correlation_id_var.set(value)
+    try:
+        yield value
+    finally:
+        correlation_id_var.reset(token)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamps the caller's correlation id on the record before it crosses the queue."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
     """
-    Sets up a standard Python logger with a StreamHandler (console output).
+    Caps noisy messages: records logged with extra={"rate_key": ...} are limited to
+    `per_second` per key. The first record let through in a new window carries the
+    number suppressed in the previous one. Records without a rate_key are not limited.
+    """
+
+    def __init__(self, per_second: int = LOG_RATE_PER_KEY):
+        super().__init__()
+        self.per_second = per_second
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            return True
+
+        now = int(time.monotonic())
+        with self._lock:
+            window, count, suppressed = self._windows.get(key, (now, 0, 0))
+            if window != now:
+                if suppressed:
+                    record.suppressed = suppressed
+                window, count, suppressed = now, 0, 0
+
+            if count >= self.per_second:
+                self._windows[key] = (window, count, suppressed + 1)
+                return False
+
+            self._windows[key] = (window, count + 1, suppressed)
+            return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        correlation_id = getattr(record, "correlation_id", None)
+        if correlation_id:
+            entry["correlation_id"] = correlation_id
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        dropped = getattr(record, "dropped", None)
+        if dropped:
+            entry["dropped"] = dropped
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+JsonFormatter.converter = time.gmtime
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records below WARNING instead of blocking when the queue is full.
+    WARNING and above wait up to LOG_BLOCKING_PUT_SECONDS for room. The next record that gets
+    through carries the number dropped since the last report.
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
 
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.DEBUG)
+    # Records dropped since the process started (for benchmarks and diagnostics)
+    dropped_total = 0
 
-    # Improved formatter with module name and line number
-    formatter = logging.Formatter(
-        "[%(asctime)s] [%(levelname)s] [%(name)s] [%(module)s:%(lineno)d] --- %(message)s"
-    )
-    ch.setFormatter(formatter)
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render message and traceback in the caller's thread (args may not be thread-safe),
+        # but keep them as fields so the listener's formatter can still emit structured output.
+        # The record is modified in place: this handler is the only one attached.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            record.dropped = dropped
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=LOG_BLOCKING_PUT_SECONDS)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                # Count this record too; the next one through reports the total
+                self.dropped += dropped + 1
+                _NonBlockingQueueHandler.dropped_total += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Blocking put: at shutdown the queue may be full, and the listener is draining it
+        self.queue.put(self._sentinel)
+
+
+# --- Process-wide Queue and Listener ---
+
+_lock = threading.Lock()
+_queue: Optional[queue.Queue] = None
+_listener: Optional[_QueueListener] = None
+_queue_handler: Optional[_NonBlockingQueueHandler] = None
+
+
+def configure_logging(stream=None, level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """
+    (Re)starts the background listener that writes queued records to `stream`
+    (stderr by default). Called automatically on first use of setup_logger.
+    """
+    global _queue, _listener, _queue_handler
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+
+        handler = logging.StreamHandler(stream or sys.stderr)
+        if fmt == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        if _queue is None:
+            _queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            _queue_handler = _NonBlockingQueueHandler(_queue)
+            _queue_handler.addFilter(CorrelationIdFilter())
+            _queue_handler.addFilter(RateLimitFilter())
+
+        _queue_handler.setLevel(level)
+        _listener = _QueueListener(_queue, handler, respect_handler_level=False)
+        _listener.start()
+
+
+def _shutdown_logging() -> None:
+    # Flush whatever is still queued before the interpreter exits
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_shutdown_logging)
+
+
+def setup_logger(name="Multi-Agent-logger"):
+    """
+    Returns a logger whose records are put on an in-memory queue and written by a
+    background listener thread, so callers never block on stdout/stderr.
+    Level and output format come from LOG_LEVEL and LOG_FORMAT.
+    """
+    if _listener is None:
+        configure_logging()
+
+    logger = logging.getLogger(name)
+    logger.setLevel(LOG_LEVEL)
+    # Records go through the queue only; don't duplicate them via root handlers
+    logger.propagate = False
 
     # This check prevents duplicate log messages if setup_logger is called multiple times.
-    if not logger.handlers:
-        logger.addHandler(ch)
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
 
-    return logger
\ No newline at end of file
+    return logger
@@ -1,6 +1,5 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import os
 from pathlib import Path
@@ -9,8 +8,21 @@ from pathlib import Path
 from backend.api.document_api import document_api
 from backend.api.task_api import task_api
 from backend.api.chat_api import chat_api
+from backend.api.catalog_api import catalog_api
+from backend.api.search_api import search_api
+from backend.api.export_api import export_api
 from backend.middlewares.exception_handlers import catch_exception_middleware
-import uvicorn
+from backend.middlewares.correlation_id import correlation_id_middleware
+from backend.db.init_db import create_schema
+from backend.service.task import TaskServices
+from backend.db.connection import pool_stats, DB_PGBOUNCER_MODE
+from backend.logger.log_utils import setup_logger
+from backend.utils.static_files import PrecompressedStaticFiles
+
+app_logger = setup_logger(name="tableforge_app")
+
+# Set to false when schema creation runs as a separate deploy step (python -m backend.db.init_db)
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "true").lower() in ("1", "true", "yes")
 
 app = FastAPI(
     title="TableForge API",
@@ -27,22 +39,36 @@ app.add_middleware(
 )
 
 app.middleware("http")(catch_exception_middleware)
+# Added last so it wraps the exception handler and unhandled errors are logged with the request id
+app.middleware("http")(correlation_id_middleware)
 
 
 # --- 2. Application Events ---
 @app.on_event("startup")
 def start():
-    print('Starting application...')
+    app_logger.info('Starting application...')
+    try:
+        if AUTO_CREATE_SCHEMA:
+            create_schema()
+        app_logger.info('Application Started')
+    except Exception as e:
+        app_logger.exception(f'Exception in startup of application: {e}')
+
+
+@app.on_event("startup")
+async def recover_tasks():
+    # The extraction queue lives in this process's memory: pick up tasks left PENDING by a restart,
+    # and fail IN_PROCESS ones whose process died so clients stop polling them
     try:
-        # Database tables are created in get_db.py (imported via routers)
-        print('Application Started')
+        await TaskServices().fail_stale_in_process()
+        await TaskServices().requeue_pending()
     except Exception as e:
-        print(f'Exception in startup of application: {e}')
+        app_logger.exception(f'Could not recover tasks after startup: {e}')
 
 
 @app.on_event("shutdown")
 def shutdown():
-    print('Application shutting down...')
+    app_logger.info('Application shutting down...')
 
 
 # --- 3. API Routes (MUST be defined before StaticFiles) ---
@@ -52,10 +78,19 @@ async def health_check():
     return {"status": "healthy", "service": "tableforge"}
 
 
+# Connection pool instrumentation (per role, for this worker process)
+@app.get("/api/health/db_pools")
+async def db_pool_health():
+    return {"pools": pool_stats(), "pgbouncer_mode": DB_PGBOUNCER_MODE}
+
+
 # Register Routers
 app.include_router(document_api, prefix="/api")
 app.include_router(task_api, prefix="/api")
 app.include_router(chat_api, prefix="/api")
+app.include_router(catalog_api, prefix="/api")
+app.include_router(search_api, prefix="/api")
+app.include_router(export_api, prefix="/api")
 
 # --- 4. Static File Serving (Frontend) ---
 # This allows FastAPI to serve the React app built into 'frontend/dist'
@@ -65,17 +100,19 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 FRONTEND_DIST = BASE_DIR / "frontend" / "dist"
 
 if FRONTEND_DIST.exists() and FRONTEND_DIST.is_dir():
-    print(f"✓ Serving React frontend from: {FRONTEND_DIST}")
+    app_logger.info(f"Serving React frontend from: {FRONTEND_DIST}")
 
     # Mount the static files directory to the root
-    # 'html=True' ensures that index.html is served for the root path
-    app.mount("/", StaticFiles(directory=str(FRONTEND_DIST), html=True), name="static")
+    # 'html=True' ensures that index.html is served for the root path.
+    # Files are held in memory with gzip/brotli variants and long-lived caching for hashed assets.
+    app.mount("/", PrecompressedStaticFiles(directory=str(FRONTEND_DIST), html=True), name="static")
 else:
-    print(f"⚠ Frontend build not found at: {FRONTEND_DIST}")
-    print("  (This is expected during local dev if you haven't run 'npm run build')")
-    print("  For local development, run the React frontend separately via 'npm run dev'.")
+    # Expected during local dev without 'npm run build'; run the frontend via 'npm run dev' instead
+    app_logger.warning(f"Frontend build not found at: {FRONTEND_DIST}")
 
 if __name__ == '__main__':
+    import uvicorn
+
     # Determine port from environment variable (Render uses PORT) or default to 8000
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
\ No newline at end of file
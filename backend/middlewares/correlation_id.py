@@ -0,0 +1,17 @@
+from fastapi import Request
+from backend.logger.log_utils import bind_correlation_id
+from backend.utils.util import get_unique_number
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+async def correlation_id_middleware(request: Request, call_next):
+    """
+    Tags all logs emitted while handling a request with its request id
+    (taken from X-Request-ID when the client sends one) and echoes it back.
+    """
+    request_id = request.headers.get(REQUEST_ID_HEADER) or get_unique_number()
+    with bind_correlation_id(request_id):
+        response = await call_next(request)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
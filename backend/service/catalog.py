@@ -0,0 +1,129 @@
+import asyncio
+from typing import Any, Dict, Optional
+from backend.utils.util import get_unique_number
+from backend.db.connection import sessionlocal, get_sessionmaker
+from backend.db.models import TableCatalogTable
+from backend.logger.log_utils import setup_logger
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+catalog_logger = setup_logger(name="catalog_service")
+
+MAX_PAGE_SIZE = 500
+
+
+def _sql_type_for(dtype) -> str:
+    """Maps a pandas dtype to the SQL type pandas.to_sql creates for it."""
+    kind = getattr(dtype, 'kind', 'O')
+    if kind == 'b':
+        return 'BOOLEAN'
+    if kind in ('i', 'u'):
+        return 'BIGINT'
+    if kind == 'f':
+        return 'DOUBLE PRECISION'
+    if kind == 'M':
+        return 'TIMESTAMP'
+    return 'TEXT'
+
+
+class CatalogServices:
+    """
+    Maintains the catalog of extracted tables (source document/task, page, schema and
+    Camelot scores) and serves paginated lookups over it.
+    """
+
+    # --- Catalog Writes (Executed in the extraction worker) ---
+
+    def record_table(self, table_name: str, document_id: str, task_id: str, df, metadata: Dict[str, Any]) -> None:
+        """
+        Upserts the catalog entry for an exported table. Re-extracting a table
+        with the same name replaces its entry.
+        """
+        columns = [{"name": str(name), "type": _sql_type_for(dtype)} for name, dtype in df.dtypes.items()]
+        values = {
+            'page_number': metadata.get('page_number'),
+            'flavor': metadata.get('flavor'),
+            'n_rows': int(len(df)),
+            'n_cols': len(columns),
+            'columns': columns,
+            'column_names': [c["name"] for c in columns],
+            'accuracy': metadata.get('accuracy'),
+            'whitespace': metadata.get('whitespace'),
+            'docID': document_id,
+            'taskID': task_id,
+        }
+
+        stmt = insert(TableCatalogTable).values(id=get_unique_number(), table_name=table_name, **values)
+        stmt = stmt.on_conflict_do_update(index_elements=[TableCatalogTable.table_name], set_=values)
+
+        # Runs in the extraction worker, so it uses the extraction pool
+        db: Session = get_sessionmaker("extraction")()
+        try:
+            db.execute(stmt)
+            db.commit()
+        except Exception:
+            db.rollback()
+            catalog_logger.exception(f'Failed to record catalog entry for table {table_name}.')
+            raise
+        finally:
+            db.close()
+
+    # --- Catalog Listing (Executed on API POST /catalogfetch_tables) ---
+
+    async def list_tables(self, document_id: Optional[str] = None, task_id: Optional[str] = None,
+                          column: Optional[str] = None, page: int = 1, page_size: int = 50) -> dict:
+        """
+        Returns one page of catalog entries, optionally filtered by document, task
+        and/or an exact column name, newest first.
+        """
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+
+        def _query() -> dict:
+            db: Session = sessionlocal()
+            try:
+                query = db.query(TableCatalogTable)
+                if document_id:
+                    query = query.filter(TableCatalogTable.docID == document_id)
+                if task_id:
+                    query = query.filter(TableCatalogTable.taskID == task_id)
+                if column:
+                    # Uses the GIN index on column_names
+                    query = query.filter(TableCatalogTable.column_names.contains([column]))
+
+                total = query.count()
+                rows = (query.order_by(TableCatalogTable.created_ts.desc(), TableCatalogTable.table_name)
+                        .offset((page - 1) * page_size)
+                        .limit(page_size)
+                        .all())
+
+                return {
+                    'items': [self._serialize(row) for row in rows],
+                    'page': page,
+                    'page_size': page_size,
+                    'total': total,
+                }
+            finally:
+                db.close()
+
+        try:
+            return await asyncio.to_thread(_query)
+        except Exception as e:
+            catalog_logger.exception(f'CatalogServices list error: {e}')
+            raise
+
+    @staticmethod
+    def _serialize(row: TableCatalogTable) -> dict:
+        return {
+            'table_name': row.table_name,
+            'document_id': row.docID,
+            'task_id': row.taskID,
+            'page_number': row.page_number,
+            'flavor': row.flavor,
+            'n_rows': row.n_rows,
+            'n_cols': row.n_cols,
+            'columns': row.columns,
+            'accuracy': row.accuracy,
+            'whitespace': row.whitespace,
+            'created_ts': row.created_ts.isoformat() if row.created_ts else None,
+        }
@@ -1,11 +1,11 @@
 import os
 import json
 import httpx
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from backend.logger.log_utils import setup_logger
-from backend.db.connection import engine, sessionlocal
-from sqlalchemy.orm import Session
-from sqlalchemy import text, inspect
+from backend.db.connection import get_engine
+from backend.service.profile import ProfileServices
+from sqlalchemy import text
 import asyncio
 
 chat_logger = setup_logger(name="chat_service")
@@ -14,6 +14,10 @@ API_KEY = os.getenv('GEMINI_API_KEY', "")
 GEMINI_MODEL = "gemini-2.5-flash-preview-09-2025"
 API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={API_KEY}"
 
+# Opt-in cap on rows sent per profiled table (0 = no limit). Profiles only cover aggregates,
+# so a cap makes lookups of rows past it unanswerable.
+CHAT_MAX_ROWS_PER_TABLE = int(os.getenv('CHAT_MAX_ROWS_PER_TABLE', 0))
+
 
 class ChatServices:
     """
@@ -22,37 +26,73 @@ class ChatServices:
 
     def __init__(self):
         self.http_client = httpx.Client(timeout=60.0)
+        self.profiles = ProfileServices()
 
-    def _fetch_table_data(self, db: Session, table_name: str) -> List[Dict[str, Any]]:
-        """Executes a SELECT * query on a given table name."""
+    def _fetch_table_data(self, connection, table_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Executes a SELECT * query on a given table name, optionally capped at `limit` rows."""
         try:
-            query = text(f'SELECT * FROM "{table_name}"')
+            query = text(f'SELECT * FROM "{table_name}"' + (' LIMIT :limit' if limit else ''))
 
-            with engine.connect() as connection:
-                result = connection.execute(query)
-                columns = result.keys()
-                data = [dict(zip(columns, row)) for row in result.all()]
+            result = connection.execute(query, {'limit': limit} if limit else {})
+            columns = result.keys()
+            data = [dict(zip(columns, row)) for row in result.all()]
 
             return data
         except Exception as e:
+            # Clear the aborted transaction so the remaining tables can still be read
+            connection.rollback()
             chat_logger.error(f"Failed to fetch data from table {table_name}: {e}")
             return []
 
-    async def get_llm_response(self, table_names: List[str], user_query: str) -> str:
+    def _fetch_tables(self, table_names: List[str], profiles: Dict[str, dict]) -> List[Dict[str, Any]]:
         """
-        Fetches all data from provided tables, constructs a prompt, and calls the Gemini API.
-        Includes a mock fallback if no API key is set (for free testing).
+        Fetches all tables over a single connection from the reader pool. If
+        CHAT_MAX_ROWS_PER_TABLE is set, profiled tables are truncated to that many rows.
         """
-        db: Session = sessionlocal()
         all_data = []
-        try:
+        with get_engine("reader").connect() as connection:
             for table_name in table_names:
-                table_data = self._fetch_table_data(db, table_name)
+                profile = profiles.get(table_name)
+                limit = None
+                if profile and CHAT_MAX_ROWS_PER_TABLE and profile['row_count'] > CHAT_MAX_ROWS_PER_TABLE:
+                    limit = CHAT_MAX_ROWS_PER_TABLE
+
+                table_data = self._fetch_table_data(connection, table_name, limit)
                 if table_data:
-                    all_data.append({
+                    entry = {
                         "source_table": table_name,
                         "data": table_data
-                    })
+                    }
+                    if limit:
+                        entry["truncated_to_rows"] = limit
+                    all_data.append(entry)
+        return all_data
+
+    def _fetch_profiles(self, table_names: List[str]) -> Dict[str, dict]:
+        # Profiles are an optimization; chat still works from raw rows without them
+        try:
+            return self.profiles.fetch_profiles(table_names)
+        except Exception as e:
+            chat_logger.warning(f"Could not load table profiles, sending raw rows only: {e}")
+            return {}
+
+    async def get_llm_response(self, table_names: List[str], user_query: str) -> str:
+        """
+        Fetches all data from provided tables, constructs a prompt, and calls the Gemini API.
+        Simple aggregate questions (totals, counts, min/max, distinct values) are answered
+        from the pre-computed table profiles without fetching rows or calling the LLM.
+        Includes a mock fallback if no API key is set (for free testing).
+        """
+        try:
+            # Blocking DB reads run in a thread so the event loop stays responsive
+            profiles = await asyncio.to_thread(self._fetch_profiles, table_names)
+
+            fast_answer = self.profiles.answer_aggregate(user_query, table_names, profiles)
+            if fast_answer is not None:
+                chat_logger.info(f"Answered query from table profiles for {len(table_names)} table(s).")
+                return fast_answer
+
+            all_data = await asyncio.to_thread(self._fetch_tables, table_names, profiles)
 
             if not all_data:
                 return "Error: Could not retrieve any data from the specified tables to answer the query."
@@ -68,17 +108,21 @@ class ChatServices:
                 )
 
             data_context = json.dumps(all_data, indent=2, ensure_ascii=False)
+            profile_context = json.dumps(ProfileServices.prompt_summary(profiles), ensure_ascii=False)
 
             system_instruction = (
                 "You are an expert financial and data analyst. Your task is to analyze the provided JSON data, which contains "
                 "tables extracted from multiple documents (like invoices). Based ONLY on the data provided, answer the user's "
                 "query concisely and accurately. If a calculation is needed (e.g., sum, average), perform it precisely using the data. "
+                "Table profiles summarize each column (null and distinct counts, frequent values, numeric stats over line items "
+                "only, excluding rows labelled subtotal/tax/total). Prefer the row data for calculations. "
                 "Maintain a professional and clear tone. State clearly if the answer cannot be determined from the data."
             )
 
             user_prompt = (
                 f"Analyze the following JSON context data, which represents several tables:\n\n"
                 f"--- START DATA CONTEXT ---\n{data_context}\n--- END DATA CONTEXT ---\n\n"
+                f"--- TABLE PROFILES ---\n{profile_context}\n--- END TABLE PROFILES ---\n\n"
                 f"--- USER QUERY ---\n{user_query}\n\n"
                 f"Please provide a final answer based ONLY on the context."
             )
@@ -105,6 +149,4 @@ class ChatServices:
 
         except Exception as e:
             chat_logger.exception(f"LLM API or data processing error: {e}")
-            return f"An internal server error occurred during LLM processing: {e}"
-        finally:
-            db.close()
\ No newline at end of file
+            return f"An internal server error occurred during LLM processing: {e}"
\ No newline at end of file
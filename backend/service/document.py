@@ -1,3 +1,4 @@
+import os
 from backend.utils.util import get_unique_number
 from backend.db.connection import sessionlocal
 from backend.db.models import DocumentTable
@@ -8,6 +9,9 @@ from sqlalchemy.exc import IntegrityError
 # Initialize logger
 service_logger = setup_logger(name="document_service")
 
+# Where uploaded PDFs are stored; shared by the upload API and the retention job
+UPLOAD_DIRECTORY = os.getenv('UPLOAD_DIRECTORY', 'uploaded_pdfs')
+
 
 class DocumentServices:
     """
@@ -0,0 +1,206 @@
+import csv
+import io
+import zipfile
+from typing import Iterator, List, Optional
+from backend.db.connection import get_engine, sessionlocal
+from backend.db.models import TableCatalogTable
+from backend.logger.log_utils import setup_logger
+from sqlalchemy.orm import Session
+from sqlalchemy import select, table, text
+
+export_logger = setup_logger(name="export_service")
+
+# Rows fetched per server-side cursor round trip, and per Arrow record batch / Parquet row group
+EXPORT_CHUNK_ROWS = 10_000
+
+EXPORT_FORMATS = {
+    'csv': {'extension': 'csv', 'media_type': 'text/csv'},
+    'parquet': {'extension': 'parquet', 'media_type': 'application/vnd.apache.parquet'},
+    'arrow': {'extension': 'arrow', 'media_type': 'application/vnd.apache.arrow.stream'},
+}
+
+
+class ExportError(Exception):
+    """Raised for export requests that cannot be served (unknown tables, missing pyarrow)."""
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only, non-seekable file object that buffers written bytes until drained.
+    Lets writers that expect a file (csv, pyarrow, zipfile) feed a streaming response.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile and pyarrow query the offset even on unseekable streams
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ExportError("Parquet and Arrow exports require the 'pyarrow' package.")
+
+
+class ExportServices:
+    """
+    Streams extracted tables out of PostgreSQL as CSV, Parquet or Arrow IPC without
+    materializing them: rows are read through a server-side cursor in chunks.
+    """
+
+    def resolve_tables(self, table_name: Optional[str] = None, document_id: Optional[str] = None,
+                       task_id: Optional[str] = None) -> List[str]:
+        """
+        Resolves the export selection to catalogued table names. Only catalogued tables
+        can be exported, which also keeps arbitrary relations out of reach.
+        """
+        db: Session = sessionlocal()
+        try:
+            query = db.query(TableCatalogTable.table_name)
+            if table_name:
+                query = query.filter(TableCatalogTable.table_name == table_name)
+            if document_id:
+                query = query.filter(TableCatalogTable.docID == document_id)
+            if task_id:
+                query = query.filter(TableCatalogTable.taskID == task_id)
+            names = [row[0] for row in query.order_by(TableCatalogTable.table_name).all()]
+        finally:
+            db.close()
+
+        if not names:
+            raise ExportError("No extracted tables match the export selection.")
+        return names
+
+    def check_format(self, export_format: str) -> None:
+        if export_format not in EXPORT_FORMATS:
+            raise ExportError(f"Unsupported export format: {export_format}")
+        if export_format != 'csv':
+            _require_pyarrow()
+
+    # --- Row Streaming ---
+
+    def _iter_chunks(self, table_name: str) -> Iterator[tuple]:
+        """
+        Yields (columns, rows) per chunk of EXPORT_CHUNK_ROWS, reading through a
+        server-side (named) cursor so only one chunk is held in memory.
+        """
+        with get_engine("reader").connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(
+                select(text('*')).select_from(table(table_name))
+            )
+            columns = list(result.keys())
+            emitted = False
+            for rows in result.partitions(EXPORT_CHUNK_ROWS):
+                emitted = True
+                yield columns, rows
+            if not emitted:
+                yield columns, []
+
+    # --- Per-format Writers (each writes into a sink and yields drained bytes) ---
+
+    def _write_csv(self, table_name: str, sink) -> Iterator[None]:
+        writer = io.TextIOWrapper(sink, encoding='utf-8', newline='', write_through=True)
+        csv_writer = csv.writer(writer)
+        header_written = False
+        for columns, rows in self._iter_chunks(table_name):
+            if not header_written:
+                csv_writer.writerow(columns)
+                header_written = True
+            csv_writer.writerows(rows)
+            yield
+        writer.detach()
+
+    def _record_batch(self, pa, schema, rows):
+        # Extracted tables are text; stringify anything else so every chunk matches the schema
+        columns = list(zip(*rows)) if rows else [[] for _ in schema.names]
+        arrays = [
+            pa.array([None if v is None else str(v) for v in values], type=pa.string())
+            for values in columns
+        ]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _write_arrow(self, table_name: str, sink) -> Iterator[None]:
+        pa = _require_pyarrow()
+        writer = None
+        for columns, rows in self._iter_chunks(table_name):
+            if writer is None:
+                schema = pa.schema([(c, pa.string()) for c in columns])
+                writer = pa.ipc.new_stream(sink, schema)
+            writer.write_batch(self._record_batch(pa, schema, rows))
+            yield
+        writer.close()
+
+    def _write_parquet(self, table_name: str, sink) -> Iterator[None]:
+        pa = _require_pyarrow()
+        writer = None
+        for columns, rows in self._iter_chunks(table_name):
+            if writer is None:
+                schema = pa.schema([(c, pa.string()) for c in columns])
+                writer = pa.parquet.ParquetWriter(sink, schema, compression='snappy')
+            # One row group per chunk keeps writer memory bounded
+            writer.write_table(pa.Table.from_batches([self._record_batch(pa, schema, rows)]))
+            yield
+        writer.close()
+
+    def _writer_for(self, export_format: str):
+        return {
+            'csv': self._write_csv,
+            'arrow': self._write_arrow,
+            'parquet': self._write_parquet,
+        }[export_format]
+
+    # --- Public Streams (consumed by StreamingResponse in a worker thread) ---
+
+    def stream_table(self, table_name: str, export_format: str) -> Iterator[bytes]:
+        """Streams a single table in the requested format."""
+        sink = _ChunkSink()
+        for _ in self._writer_for(export_format)(table_name, sink):
+            data = sink.drain()
+            if data:
+                yield data
+        data = sink.drain()
+        if data:
+            yield data
+
+    def stream_zip(self, table_names: List[str], export_format: str) -> Iterator[bytes]:
+        """Streams several tables as members of a zip archive, one file per table."""
+        extension = EXPORT_FORMATS[export_format]['extension']
+        sink = _ChunkSink()
+
+        # Parquet/Arrow are already compressed or binary; avoid burning CPU deflating them again
+        compression = zipfile.ZIP_DEFLATED if export_format == 'csv' else zipfile.ZIP_STORED
+        with zipfile.ZipFile(sink, mode='w', compression=compression) as archive:
+            for table_name in table_names:
+                with archive.open(f"{table_name}.{extension}", mode='w', force_zip64=True) as member:
+                    for data in self.stream_table(table_name, export_format):
+                        member.write(data)
+                        drained = sink.drain()
+                        if drained:
+                            yield drained
+                export_logger.info(f"Exported {table_name} into zip archive.")
+
+        data = sink.drain()
+        if data:
+            yield data
@@ -0,0 +1,361 @@
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional
+from backend.db.connection import sessionlocal, get_sessionmaker
+from backend.db.models import TableProfileTable
+from backend.logger.log_utils import setup_logger
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+profile_logger = setup_logger(name="profile_service")
+
+# Most frequent values kept per column
+PROFILE_TOP_K = int(os.getenv('PROFILE_TOP_K', 5))
+# A column is profiled as numeric when at least this share of its non-empty cells parse as numbers
+NUMERIC_MIN_RATIO = 0.8
+# Cells Camelot emits for empty table cells
+NULL_MARKERS = ('', '-', '--', '—', '–', 'n/a', 'N/A', 'nan', 'None')
+# Amounts as printed in documents: thousands separators, currency, accounting negatives, percentages
+NUMBER_PATTERN = r'\(?[-+]?\s*[$€£¥]?\s*-?(?:\d{1,3}(?:,\d{3})+|\d+)?(?:\.\d+)?\s*%?\)?'
+# Labels of invoice summary rows (subtotal, tax, total, ...), matched in non-numeric cells
+SUMMARY_LABEL_PATTERN = r'(?i)\b(?:sub[\s-]?total|grand\s+total|total|tax|vat|gst|balance|amount\s+due)\b'
+
+# --- Question Parsing (aggregate fast path) ---
+# A question is answered from profiles only if it consists of exactly one aggregate phrase,
+# at most one column name and FILLER_WORDS. Anything else (names, dates, filters) goes to the LLM.
+_ROW_NOUNS = ('rows', 'records', 'entries', 'lines')
+AGGREGATE_PHRASES = {
+    'count_rows': [('how', 'many', noun) for noun in _ROW_NOUNS]
+                  + [(word, 'of', noun) for word in ('number', 'count') for noun in _ROW_NOUNS]
+                  + [('row', 'count')],
+    'distinct': [('distinct',), ('unique',)],
+    'sum': [('sum',), ('total',)],
+    'mean': [('average',), ('avg',), ('mean',)],
+    'min': [('min',), ('minimum',), ('lowest',), ('smallest',)],
+    'max': [('max',), ('maximum',), ('highest',), ('largest',), ('biggest',)],
+}
+FILLER_WORDS = frozenset((
+    'what', 's', 'is', 'are', 'was', 'the', 'a', 'an', 'of', 'in', 'all', 'overall', 'there', 'value', 'values',
+    'give', 'me', 'show', 'tell', 'calculate', 'compute', 'find', 'get', 'please', 'this', 'these', 'table',
+    'tables', 'column', 'how', 'many', 'count', 'number', 'do', 'does', 'we', 'have',
+))
+# Such questions ask for the row holding a value, which profiles do not store
+ROW_LOOKUP_WORDS = frozenset(('which', 'who', 'whose', 'whom'))
+
+OPERATION_LABELS = {
+    'sum': 'Total',
+    'mean': 'Average',
+    'min': 'Minimum',
+    'max': 'Maximum',
+}
+
+
+def _parse_numbers(series):
+    """Parses table cells like '1,234.50', '$ 12', '(45.00)' or '12%' into floats (NaN otherwise)."""
+    import pandas as pd
+
+    text = series.astype(str).str.strip()
+    valid = text.str.fullmatch(NUMBER_PATTERN) & text.str.contains(r'\d')
+    negative = text.str.contains(r'^\(|-')
+    cleaned = text.str.replace(r'[\s,$€£¥%()+-]', '', regex=True)
+    numbers = pd.to_numeric(cleaned.where(valid), errors='coerce')
+    return numbers.where(~negative, -numbers)
+
+
+def _json_number(value: float):
+    """Floats as JSON-safe numbers; integral values become ints."""
+    if value is None or not math.isfinite(value):
+        return None
+    return int(value) if float(value).is_integer() and abs(value) < 2 ** 53 else float(value)
+
+
+def _words(text: str) -> List[str]:
+    """Lower-cased alphanumeric words; underscores split words so column names match prose."""
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def _find(words: List[str], phrase: tuple) -> Optional[int]:
+    """Start index of phrase as a contiguous run of words, or None."""
+    if not phrase:
+        return None
+    for start in range(len(words) - len(phrase) + 1):
+        if tuple(words[start:start + len(phrase)]) == phrase:
+            return start
+    return None
+
+
+def _format_number(value) -> str:
+    if isinstance(value, int):
+        return f"{value:,}"
+    return f"{value:,.4f}".rstrip('0').rstrip('.')
+
+
+class ProfileServices:
+    """
+    Pre-computes per-table column profiles (row counts, null counts, top values and
+    numeric sum/mean/min/max) at extraction time, and answers simple aggregate
+    questions from them without reading the table rows.
+    """
+
+    # --- Profile Computation & Writes (Executed in the extraction worker) ---
+
+    @staticmethod
+    def summary_row_mask(df):
+        """
+        Flags summary rows (subtotal, tax, total, balance) by their label: a non-numeric
+        cell matching SUMMARY_LABEL_PATTERN. Their amounts repeat the line items'.
+        """
+        import pandas as pd
+
+        mask = pd.Series(False, index=df.index)
+        for position in range(df.shape[1]):
+            cells = df.iloc[:, position]
+            text = cells.astype(str).str.strip()
+            labels = cells.notna() & _parse_numbers(text).isna()
+            mask |= labels & text.str.contains(SUMMARY_LABEL_PATTERN, regex=True)
+        return mask
+
+    @staticmethod
+    def compute_profile(df) -> Dict[str, Any]:
+        """
+        Returns the profile of an extracted DataFrame: row count, number of summary rows
+        and one stats dict per column. Numeric stats cover line items only (summary rows
+        are left out); counts and top values cover every row.
+        """
+        summary_rows = ProfileServices.summary_row_mask(df)
+        columns = []
+        for position in range(df.shape[1]):
+            name = str(df.columns[position])
+            cells = df.iloc[:, position]
+
+            text = cells.astype(str).str.strip()
+            present = cells.notna() & ~text.isin(NULL_MARKERS)
+            values = text[present]
+
+            counts = values.value_counts()
+            column = {
+                'name': name,
+                'non_null': int(present.sum()),
+                'nulls': int(len(cells) - present.sum()),
+                'distinct': int(len(counts)),
+                'top_values': [[str(v), int(c)] for v, c in counts.head(PROFILE_TOP_K).items()],
+                'numeric': None,
+            }
+
+            item_values = values[~summary_rows[present]]
+            numbers = _parse_numbers(item_values).dropna()
+            if len(item_values) and len(numbers) >= NUMERIC_MIN_RATIO * len(item_values):
+                total = math.fsum(numbers.tolist())
+                running = 0.0
+                equals_running_sum = False
+                for i, number in enumerate(numbers.tolist()):
+                    if i >= 2 and math.isclose(number, running, rel_tol=1e-9, abs_tol=1e-6):
+                        equals_running_sum = True
+                    running += number
+                column['numeric'] = {
+                    'count': int(len(numbers)),
+                    # Non-empty cells that did not parse as numbers
+                    'invalid': int(len(item_values) - len(numbers)),
+                    'sum': _json_number(total),
+                    'mean': _json_number(total / len(numbers)),
+                    'min': _json_number(float(numbers.min())),
+                    'max': _json_number(float(numbers.max())),
+                    # Unlabelled total/subtotal rows: a value equal to the sum of the values above it,
+                    # or a maximum equal to the sum of all others
+                    'possible_total_row': bool(len(numbers) > 2 and (
+                        equals_running_sum
+                        or math.isclose(float(numbers.max()) * 2, total, rel_tol=1e-9, abs_tol=1e-6)
+                    )),
+                }
+            columns.append(column)
+
+        return {
+            'row_count': int(len(df)),
+            'summary_rows': int(summary_rows.sum()),
+            'columns': columns,
+        }
+
+    def record_profile(self, table_name: str, document_id: str, task_id: str, df) -> None:
+        """
+        Upserts the profile of an exported table. Re-extracting a table with the
+        same name replaces its profile.
+        """
+        values = {
+            'docID': document_id,
+            'taskID': task_id,
+            **self.compute_profile(df),
+        }
+
+        stmt = insert(TableProfileTable).values(table_name=table_name, **values)
+        stmt = stmt.on_conflict_do_update(index_elements=[TableProfileTable.table_name], set_=values)
+
+        # Runs in the extraction worker, so it uses the extraction pool
+        db: Session = get_sessionmaker("extraction")()
+        try:
+            db.execute(stmt)
+            db.commit()
+        except Exception:
+            db.rollback()
+            profile_logger.exception(f'Failed to record profile for table {table_name}.')
+            raise
+        finally:
+            db.close()
+
+    # --- Profile Reads (Executed by ChatServices in a worker thread) ---
+
+    def fetch_profiles(self, table_names: List[str]) -> Dict[str, dict]:
+        """Returns {table_name: {'row_count': ..., 'summary_rows': ..., 'columns': [...]}} for the profiled tables."""
+        if not table_names:
+            return {}
+
+        db: Session = sessionlocal()
+        try:
+            rows = db.query(TableProfileTable).filter(TableProfileTable.table_name.in_(table_names)).all()
+            return {
+                row.table_name: {'row_count': row.row_count, 'summary_rows': row.summary_rows, 'columns': row.columns}
+                for row in rows
+            }
+        finally:
+            db.close()
+
+    # --- Aggregate Fast Path ---
+
+    def answer_aggregate(self, question: str, table_names: List[str], profiles: Dict[str, dict]) -> Optional[str]:
+        """
+        Answers questions like "what is the total amount" or "how many rows" from the
+        profiles. Returns None whenever the question is not a plain single aggregate or
+        the profiles cannot answer it exactly; the caller then falls back to the LLM.
+        """
+        if not table_names or any(name not in profiles for name in table_names):
+            return None
+        # Subtotal/tax/total rows skew sums, extremes, row counts and distinct labels alike
+        if any(profiles[name].get('summary_rows') for name in table_names):
+            return None
+
+        words = _words(question)
+        if not words or ROW_LOOKUP_WORDS.intersection(words):
+            return None
+
+        # Words that are also cell values (names, labels) make the question a lookup or filter
+        for name in table_names:
+            for c in profiles[name]['columns']:
+                for value, _ in c['top_values']:
+                    if _find(words, tuple(_words(value))) is not None:
+                        return None
+
+        # Longest column name mentioned in the question, e.g. "unit_price" before "price"
+        column_names = {c['name'] for name in table_names for c in profiles[name]['columns'] if c['name']}
+        column = None
+        for candidate in sorted(column_names, key=len, reverse=True):
+            start = _find(words, tuple(_words(candidate)))
+            if start is not None:
+                column = candidate
+                words = words[:start] + words[start + len(_words(candidate)):]
+                break
+
+        matched = []
+        for op, phrases in AGGREGATE_PHRASES.items():
+            for phrase in phrases:
+                start = _find(words, phrase)
+                if start is not None:
+                    matched.append((op, start, len(phrase)))
+                    break
+        if len(matched) != 1:
+            return None
+        operation, start, length = matched[0]
+        words = words[:start] + words[start + length:]
+
+        # Allow-list: every remaining word must be filler
+        if any(word not in FILLER_WORDS for word in words):
+            return None
+
+        if operation == 'count_rows':
+            return self._answer_row_count(table_names, profiles) if column is None else None
+        if column is None:
+            return None
+
+        stats = {}
+        for name in table_names:
+            matches = [c for c in profiles[name]['columns'] if c['name'] == column]
+            if len(matches) > 1:
+                # Duplicate column names: ambiguous
+                return None
+            if matches:
+                stats[name] = matches[0]
+        if not stats:
+            return None
+
+        if operation == 'distinct':
+            return self._answer_distinct(column, stats)
+        return self._answer_numeric(operation, column, stats)
+
+    @staticmethod
+    def _answer_row_count(table_names: List[str], profiles: Dict[str, dict]) -> str:
+        lines = [f"- `{name}`: {_format_number(profiles[name]['row_count'])}" for name in table_names]
+        total = sum(profiles[name]['row_count'] for name in table_names)
+        return (f"**Row count:** {_format_number(total)}\n\n" + "\n".join(lines) +
+                "\n\n_Answered from pre-computed table profiles._")
+
+    @staticmethod
+    def _answer_distinct(column: str, stats: Dict[str, dict]) -> Optional[str]:
+        # Distinct counts only combine exactly when every table's full value set is known
+        if len(stats) > 1 and any(s['distinct'] > len(s['top_values']) for s in stats.values()):
+            return None
+
+        counts: Dict[str, int] = {}
+        for s in stats.values():
+            for value, count in s['top_values']:
+                counts[value] = counts.get(value, 0) + count
+        distinct = next(iter(stats.values()))['distinct'] if len(stats) == 1 else len(counts)
+
+        top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:PROFILE_TOP_K]
+        complete = distinct <= len(top)
+        heading = "Values" if complete else f"Most frequent {len(top)} values"
+        lines = [f"- {value} ({_format_number(count)})" for value, count in top]
+        return (f"**Distinct values of `{column}`:** {_format_number(distinct)}\n\n{heading}:\n" + "\n".join(lines) +
+                "\n\n_Answered from pre-computed table profiles._")
+
+    @staticmethod
+    def _answer_numeric(operation: str, column: str, stats: Dict[str, dict]) -> Optional[str]:
+        numeric = {}
+        for name, s in stats.items():
+            n = s['numeric']
+            # Only exact answers: every non-empty cell must have parsed as a number
+            if n is None or n['invalid'] or n['count'] == 0:
+                return None
+            if operation in ('sum', 'mean', 'max') and n['possible_total_row']:
+                return None
+            numeric[name] = n
+
+        if operation == 'sum':
+            value = _json_number(math.fsum(n['sum'] for n in numeric.values()))
+        elif operation == 'mean':
+            value = _json_number(math.fsum(n['sum'] for n in numeric.values()) / sum(n['count'] for n in numeric.values()))
+        elif operation == 'min':
+            value = min(n['min'] for n in numeric.values())
+        else:
+            value = max(n['max'] for n in numeric.values())
+
+        lines = [f"- `{name}`: {_format_number(n[operation])} over {_format_number(n['count'])} values"
+                 for name, n in numeric.items()]
+        return (f"**{OPERATION_LABELS[operation]} of `{column}`:** {_format_number(value)}\n\n" + "\n".join(lines) +
+                "\n\n_Answered from pre-computed table profiles._")
+
+    # --- Prompt Context ---
+
+    @staticmethod
+    def prompt_summary(profiles: Dict[str, dict]) -> List[Dict[str, Any]]:
+        """Compact per-table stats for the LLM prompt (top values trimmed to three)."""
+        summary = []
+        for table_name, profile in profiles.items():
+            columns = []
+            for c in profile['columns']:
+                entry = {'name': c['name'], 'nulls': c['nulls'], 'distinct': c['distinct'],
+                         'top_values': c['top_values'][:3]}
+                if c['numeric'] is not None:
+                    entry['numeric'] = {k: c['numeric'][k] for k in ('count', 'sum', 'mean', 'min', 'max')}
+                columns.append(entry)
+            summary.append({'source_table': table_name, 'row_count': profile['row_count'],
+                            'summary_rows': profile.get('summary_rows', 0), 'columns': columns})
+        return summary
@@ -0,0 +1,321 @@
+import gzip
+import os
+import re
+import shutil
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Set
+from backend.db.connection import get_sessionmaker
+from backend.db.models import DocumentTable, TaskTable, TableCatalogTable, TableRowIndexTable, TableProfileTable
+from backend.logger.log_utils import setup_logger
+from backend.service.document import UPLOAD_DIRECTORY
+from backend.service.task import ACTIVE_STATUSES, STATUS_COMPLETED
+from backend.utils.util import get_current_datetime
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+retention_logger = setup_logger(name="retention_service")
+
+# --- Retention Policy (from environment) ---
+# Documents older than this many days are expired (0, the default, disables age-based expiry)
+RETENTION_DAYS = int(os.getenv('RETENTION_DAYS', 0))
+# Per-tenant overrides, e.g. "acme=30,trial=7"
+RETENTION_TENANT_DAYS = os.getenv('RETENTION_TENANT_DAYS', '')
+# Drop tables of earlier runs once a newer task for the same document has completed
+RETENTION_DROP_SUPERSEDED = os.getenv('RETENTION_DROP_SUPERSEDED', 'false').lower() in ('1', 'true', 'yes')
+# 'archive' gzips PDFs into ARCHIVE_DIRECTORY before removing them, 'delete' removes them
+RETENTION_PDF_ACTION = os.getenv('RETENTION_PDF_ACTION', 'archive').lower()
+ARCHIVE_DIRECTORY = os.getenv('ARCHIVE_DIRECTORY', 'archived_pdfs')
+# Unreferenced uploads younger than this are left alone (upload may still be registering)
+ORPHAN_FILE_GRACE_SECONDS = int(os.getenv('RETENTION_ORPHAN_FILE_GRACE_SECONDS', 24 * 3600))
+
+# --- Throttling ---
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', 50))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv('RETENTION_BATCH_PAUSE_SECONDS', 2))
+RETENTION_MAX_TABLES_PER_RUN = int(os.getenv('RETENTION_MAX_TABLES_PER_RUN', 5000))
+# A DROP waiting longer than this for its lock is skipped until the next run
+RETENTION_LOCK_TIMEOUT = os.getenv('RETENTION_LOCK_TIMEOUT', '2s')
+if not re.fullmatch(r'[0-9]+(ms|s|min)?', RETENTION_LOCK_TIMEOUT):
+    RETENTION_LOCK_TIMEOUT = '2s'
+
+EXTRACTED_TABLE_RE = r'^[0-9a-f-]{36}_table_[0-9]+$'
+
+
+def parse_tenant_days(spec: str) -> Dict[str, int]:
+    """Parses "tenant=days,tenant=days" into a dict, ignoring malformed entries."""
+    policies = {}
+    for item in spec.split(','):
+        tenant, _, days = item.partition('=')
+        if tenant.strip() and days.strip().isdigit():
+            policies[tenant.strip()] = int(days.strip())
+    return policies
+
+
+class RetentionServices:
+    """
+    Reclaims space from extracted tables and uploaded PDFs:
+
+    - drops orphaned extraction tables (no task row) and, if RETENTION_DROP_SUPERSEDED is set,
+      tables superseded by a newer run,
+    - expires documents past their tenant's retention period (tables, index rows, tasks, PDF),
+      if RETENTION_DAYS or a tenant period is set,
+    - archives or deletes PDFs no longer referenced by any document.
+
+    Nothing runs on a schedule unless the daemon has RETENTION_ENABLED set.
+
+    Work is done in small batches, one short transaction per table with a lock timeout, and
+    pauses between batches so it does not compete with ingestion.
+    """
+
+    def __init__(self, tenant_days: Optional[Dict[str, int]] = None, default_days: int = RETENTION_DAYS):
+        self.default_days = default_days
+        self.tenant_days = tenant_days if tenant_days is not None else parse_tenant_days(RETENTION_TENANT_DAYS)
+        # Maintenance writes use the writer pool, not the API one
+        self.sessionmaker = get_sessionmaker("extraction")
+        self.report = {}
+
+    # --- Entry Point (Executed from the daemon) ---
+
+    def run(self) -> dict:
+        """Runs one retention pass and returns a report of what was reclaimed."""
+        started = time.monotonic()
+        self.report = {
+            'tables_dropped': 0,
+            'tables_skipped': 0,
+            'db_bytes_reclaimed': 0,
+            'documents_expired': 0,
+            'pdfs_archived': 0,
+            'pdfs_deleted': 0,
+            'file_bytes_reclaimed': 0,
+        }
+
+        expired_docs = self._expired_documents()
+        droppable = self._droppable_tables(expired_docs)
+        self._drop_tables(droppable)
+        self._expire_documents(expired_docs)
+        self._remove_unreferenced_pdfs()
+
+        self.report['duration_seconds'] = round(time.monotonic() - started, 1)
+        retention_logger.info(f"Retention pass finished: {self.report}")
+        return self.report
+
+    # --- Selection ---
+
+    def _expired_documents(self) -> List[DocumentTable]:
+        """Documents older than the retention period of their tenant (taken from their latest task)."""
+        periods = [d for d in [self.default_days, *self.tenant_days.values()] if d > 0]
+        if not periods:
+            return []
+
+        now = get_current_datetime()
+        db: Session = self.sessionmaker()
+        try:
+            candidates = (db.query(DocumentTable)
+                          .filter(DocumentTable.created_ts < now - timedelta(days=min(periods)))
+                          .all())
+            if not candidates:
+                return []
+
+            candidate_ids = [d.id for d in candidates]
+            tasks = (db.query(TaskTable.docID, TaskTable.tenant, TaskTable.status)
+                     .filter(TaskTable.docID.in_(candidate_ids))
+                     .order_by(TaskTable.created_ts)
+                     .all())
+        finally:
+            db.close()
+
+        tenants, busy = {}, set()
+        for doc_id, tenant, status in tasks:
+            tenants[doc_id] = tenant  # ordered by created_ts, so the latest task wins
+            if status in ACTIVE_STATUSES:
+                busy.add(doc_id)
+
+        expired = []
+        for doc in candidates:
+            days = self.tenant_days.get(tenants.get(doc.id, 'default'), self.default_days)
+            if doc.id not in busy and days > 0 and doc.created_ts < now - timedelta(days=days):
+                expired.append(doc)
+        return expired
+
+    def _droppable_tables(self, expired_docs: List[DocumentTable]) -> List[tuple]:
+        """
+        Returns (table_name, size_bytes) for extraction tables that are orphaned, superseded
+        or belong to an expired document. Largest first, so each batch reclaims the most.
+        """
+        expired_ids = {d.id for d in expired_docs}
+        db: Session = self.sessionmaker()
+        try:
+            relations = db.execute(text(
+                "SELECT c.relname, pg_total_relation_size(c.oid) "
+                "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = current_schema() AND c.relkind = 'r' AND c.relname ~ :pattern"
+            ), {'pattern': EXTRACTED_TABLE_RE}).all()
+            tasks = db.query(TaskTable.id, TaskTable.docID, TaskTable.status).order_by(TaskTable.created_ts).all()
+        finally:
+            db.close()
+
+        task_docs = {task_id: doc_id for task_id, doc_id, _ in tasks}
+        live: Set[str] = set()
+        latest_completed = {}
+        for task_id, doc_id, status in tasks:
+            if status in ACTIVE_STATUSES:
+                live.add(task_id)
+            elif status == STATUS_COMPLETED:
+                latest_completed[doc_id] = task_id
+        live.update(latest_completed.values())
+
+        droppable = []
+        for relname, size in relations:
+            # Tables are named <task_id>_table_<n>
+            task_id = relname.rsplit('_table_', 1)[0]
+            doc_id = task_docs.get(task_id)
+            orphaned = doc_id is None
+            superseded = RETENTION_DROP_SUPERSEDED and task_id not in live
+            if orphaned or superseded or doc_id in expired_ids:
+                droppable.append((relname, int(size or 0)))
+
+        droppable.sort(key=lambda item: item[1], reverse=True)
+        return droppable[:RETENTION_MAX_TABLES_PER_RUN]
+
+    # --- Table Dropping ---
+
+    def _drop_table(self, table_name: str) -> bool:
+        """Drops one table and its catalog/index/profile rows in a short transaction with a lock timeout."""
+        db: Session = self.sessionmaker()
+        try:
+            # SET LOCAL only lasts for this transaction; the value is format-checked at import
+            db.execute(text(f"SET LOCAL lock_timeout = '{RETENTION_LOCK_TIMEOUT}'"))
+            quoted = table_name.replace('"', '""')
+            db.execute(text(f'DROP TABLE IF EXISTS "{quoted}"'))
+            for model in (TableRowIndexTable, TableCatalogTable, TableProfileTable):
+                db.query(model).filter(model.table_name == table_name).delete(synchronize_session=False)
+            self._mark_table_removed(db, table_name)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            retention_logger.warning(f"Skipped dropping {table_name}: {e}")
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    def _mark_table_removed(db: Session, table_name: str) -> None:
+        """Removes a dropped table from its task's output so /taskfetch_output no longer lists it."""
+        task = db.get(TaskTable, table_name.rsplit('_table_', 1)[0], with_for_update=True)
+        if task is None:
+            return
+
+        output = dict(task.output or {})
+        output['extracted_tables'] = [t for t in output.get('extracted_tables') or [] if t != table_name]
+        output['removed_by_retention'] = sorted(set(output.get('removed_by_retention') or []) | {table_name})
+        # Reassigned, not mutated, so the JSON column is flagged as changed
+        task.output = output
+
+    def _drop_tables(self, tables: List[tuple]) -> None:
+        for start in range(0, len(tables), RETENTION_BATCH_SIZE):
+            for table_name, size in tables[start:start + RETENTION_BATCH_SIZE]:
+                if self._drop_table(table_name):
+                    self.report['tables_dropped'] += 1
+                    self.report['db_bytes_reclaimed'] += size
+                else:
+                    self.report['tables_skipped'] += 1
+
+            if start + RETENTION_BATCH_SIZE < len(tables):
+                time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+
+    # --- Document Expiry ---
+
+    def _expire_documents(self, expired_docs: List[DocumentTable]) -> None:
+        for i, doc in enumerate(expired_docs):
+            db: Session = self.sessionmaker()
+            try:
+                # Lock the document so no task can be created for it (the Task.docID foreign key
+                # check waits on this lock), then re-check: a task may have started since selection
+                locked = (db.query(DocumentTable.id).filter(DocumentTable.id == doc.id)
+                          .with_for_update().first())
+                active = (db.query(TaskTable.id)
+                          .filter(TaskTable.docID == doc.id, TaskTable.status.in_(ACTIVE_STATUSES))
+                          .first())
+                if locked is None or active is not None:
+                    db.rollback()
+                    continue
+
+                remaining = db.execute(text(
+                    "SELECT count(*) FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                    "JOIN \"Task\" t ON c.relname LIKE t.id || '\\_table\\_%' "
+                    "WHERE n.nspname = current_schema() AND c.relkind = 'r' AND t.\"docID\" = :doc_id"
+                ), {'doc_id': doc.id}).scalar()
+                if remaining:
+                    # Some table drops were skipped (lock timeout); retry on the next pass
+                    db.rollback()
+                    continue
+
+                for model in (TableRowIndexTable, TableCatalogTable, TableProfileTable, TaskTable):
+                    db.query(model).filter(model.docID == doc.id).delete(synchronize_session=False)
+                db.query(DocumentTable).filter(DocumentTable.id == doc.id).delete(synchronize_session=False)
+                db.commit()
+                self.report['documents_expired'] += 1
+            except Exception as e:
+                db.rollback()
+                retention_logger.warning(f"Could not expire document {doc.id}: {e}")
+                continue
+            finally:
+                db.close()
+
+            self._dispose_pdf(doc.storage_path, archive_name=f"{doc.id}_{os.path.basename(doc.storage_path)}")
+            if (i + 1) % RETENTION_BATCH_SIZE == 0:
+                time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+
+    # --- File Retention ---
+
+    def _dispose_pdf(self, path: str, archive_name: str) -> None:
+        """Archives (gzip) or deletes a PDF unless another document still references it."""
+        if not path or not os.path.isfile(path):
+            return
+
+        db: Session = self.sessionmaker()
+        try:
+            still_referenced = db.query(DocumentTable.id).filter(DocumentTable.storage_path == path).first()
+        finally:
+            db.close()
+        if still_referenced:
+            return
+
+        try:
+            original_size = os.path.getsize(path)
+            if RETENTION_PDF_ACTION == 'archive':
+                os.makedirs(ARCHIVE_DIRECTORY, exist_ok=True)
+                archive_path = os.path.join(ARCHIVE_DIRECTORY, archive_name + '.gz')
+                with open(path, 'rb') as source, gzip.open(archive_path, 'wb', compresslevel=6) as target:
+                    shutil.copyfileobj(source, target)
+                os.remove(path)
+                # The document row may be gone; the log is the record of where the PDF went
+                retention_logger.info(f"Archived {path} to {archive_path}.")
+                self.report['pdfs_archived'] += 1
+                self.report['file_bytes_reclaimed'] += original_size - os.path.getsize(archive_path)
+            else:
+                os.remove(path)
+                self.report['pdfs_deleted'] += 1
+                self.report['file_bytes_reclaimed'] += original_size
+        except OSError as e:
+            retention_logger.warning(f"Could not remove PDF {path}: {e}")
+
+    def _remove_unreferenced_pdfs(self) -> None:
+        if not os.path.isdir(UPLOAD_DIRECTORY):
+            return
+
+        db: Session = self.sessionmaker()
+        try:
+            referenced = {os.path.normpath(p) for (p,) in db.query(DocumentTable.storage_path).all()}
+        finally:
+            db.close()
+
+        cutoff = time.time() - ORPHAN_FILE_GRACE_SECONDS
+        for entry in os.scandir(UPLOAD_DIRECTORY):
+            if not entry.is_file():
+                continue
+            path = os.path.normpath(entry.path)
+            if path in referenced or entry.stat().st_mtime > cutoff:
+                continue
+            self._dispose_pdf(path, archive_name=f"unreferenced_{entry.name}")
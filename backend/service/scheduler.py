@@ -0,0 +1,291 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from backend.logger.log_utils import setup_logger
+
+scheduler_logger = setup_logger(name="extraction_scheduler")
+
+# --- Scheduling Configuration ---
+PRIORITY_CLASSES = {'high': 0, 'normal': 1, 'low': 2}
+DEFAULT_PRIORITY = 'normal'
+DEFAULT_TENANT = 'default'
+
+# Per API worker process: with N uvicorn workers up to N x EXTRACTION_MAX_WORKERS extractions run at once
+MAX_CONCURRENT_EXTRACTIONS = int(os.getenv('EXTRACTION_MAX_WORKERS', os.cpu_count() or 2))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv('EXTRACTION_TIMEOUT_SECONDS', 15 * 60))
+# How often a running job re-checks for cancellation (e.g. requested through another API worker)
+CANCEL_POLL_SECONDS = float(os.getenv('EXTRACTION_CANCEL_POLL_SECONDS', 5))
+
+# Used when the page count cannot be read: roughly one page per 100 KB
+BYTES_PER_PAGE_ESTIMATE = 100 * 1024
+
+
+class ExtractionTimeout(Exception):
+    """Raised when an extraction worker exceeds its wall-clock budget and is killed."""
+
+
+class ExtractionCancelled(Exception):
+    """Raised when an extraction is cancelled while queued or running."""
+
+
+def estimate_cost(pdf_path: str) -> float:
+    """
+    Estimates the relative cost of extracting a PDF. Page count dominates Camelot's
+    runtime; file size is added as a tie-breaker for image-heavy documents.
+    """
+    try:
+        size_bytes = os.path.getsize(pdf_path)
+    except OSError:
+        size_bytes = 0
+
+    pages = None
+    try:
+        # Imported lazily: only needed when a task is submitted
+        from PyPDF2 import PdfReader
+        pages = len(PdfReader(pdf_path).pages)
+    except Exception as e:
+        scheduler_logger.warning(f"Could not read page count of {pdf_path}, estimating from size: {e}")
+
+    if pages is None:
+        pages = max(1, size_bytes // BYTES_PER_PAGE_ESTIMATE)
+
+    return float(pages) + size_bytes / (1024 * 1024)
+
+
+class ExtractionJob:
+    """A queued or running extraction, as tracked by the scheduler."""
+
+    def __init__(self, task_id: str, tenant: str, priority: str, cost: float,
+                 runner: Callable[['ExtractionJob'], Awaitable[None]]):
+        self.task_id = task_id
+        self.tenant = tenant
+        self.priority = priority
+        self.cost = cost
+        self.runner = runner
+        self.cancelled = False
+        self.process = None
+        self.submitted_at = time.monotonic()
+
+    def __repr__(self):
+        return f"ExtractionJob(task_id={self.task_id}, tenant={self.tenant}, priority={self.priority}, cost={self.cost:.1f})"
+
+
+class ExtractionScheduler:
+    """
+    Runs extraction jobs with bounded concurrency.
+
+    Dispatch order: strict priority class first; within a class, the tenant with the
+    lowest virtual time (cost already consumed) goes next, so one tenant's large batch
+    cannot starve others; within a tenant, the cheapest job goes first so one-page
+    invoices are not stuck behind 800-page reports.
+
+    The scheduler is per process: concurrency limits and fair share hold within one API
+    worker, not across workers, and the queue is in memory. PENDING tasks are re-queued
+    from the database at startup (TaskServices.requeue_pending) so a restart loses none.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_EXTRACTIONS):
+        self.max_concurrent = max(1, max_concurrent)
+        # priority -> tenant -> heap of (cost, seq, job)
+        self._queues: Dict[int, Dict[str, List[tuple]]] = {}
+        self._tenant_vtime: Dict[str, float] = {}
+        self._global_vtime = 0.0
+        self._queued: Dict[str, ExtractionJob] = {}
+        self._running: Dict[str, ExtractionJob] = {}
+        self._tasks = set()
+        self._seq = itertools.count()
+        # Threads that wait on worker processes. One per slot, so a running job always has
+        # one, and waiting never takes threads from asyncio's shared to_thread pool.
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='extraction-wait')
+
+    # --- Submission & Cancellation ---
+
+    def submit(self, job: ExtractionJob) -> None:
+        """Queues a job and starts it immediately if a slot is free. Must be called on the event loop."""
+        level = PRIORITY_CLASSES[job.priority]
+        tenants = self._queues.setdefault(level, {})
+
+        if not tenants.get(job.tenant):
+            # A tenant becoming backlogged starts at the current virtual time instead of
+            # redeeming credit accumulated while idle
+            self._tenant_vtime[job.tenant] = max(self._tenant_vtime.get(job.tenant, 0.0), self._global_vtime)
+
+        heapq.heappush(tenants.setdefault(job.tenant, []), (job.cost, next(self._seq), job))
+        self._queued[job.task_id] = job
+        scheduler_logger.info(f"Queued {job} ({len(self._queued)} queued, {len(self._running)} running).")
+        self._dispatch()
+
+    def cancel(self, task_id: str) -> Optional[str]:
+        """
+        Cancels a queued or running job. Running jobs have their worker process killed.
+
+        Returns:
+            Optional[str]: 'queued' or 'running' if the job was found, otherwise None.
+        """
+        job = self._queued.pop(task_id, None)
+        if job is not None:
+            # Removed lazily from its heap when dispatch reaches it
+            job.cancelled = True
+            scheduler_logger.info(f"Cancelled queued task {task_id}.")
+            return 'queued'
+
+        job = self._running.get(task_id)
+        if job is not None:
+            job.cancelled = True
+            _kill(job.process)
+            scheduler_logger.info(f"Cancelled running task {task_id}.")
+            return 'running'
+
+        return None
+
+    def stats(self) -> dict:
+        return {
+            'queued': len(self._queued),
+            'running': len(self._running),
+            'max_concurrent': self.max_concurrent,
+        }
+
+    async def run_in_worker(self, job: 'ExtractionJob', target: Callable[..., Any], kwargs: dict,
+                            should_cancel: Optional[Callable[[], bool]] = None,
+                            timeout: float = EXTRACTION_TIMEOUT_SECONDS) -> Any:
+        """Awaits run_in_worker_process on the scheduler's own wait threads."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(run_in_worker_process, job, target, kwargs,
+                                 timeout=timeout, should_cancel=should_cancel)
+        # Like asyncio.to_thread, keep the caller's context (correlation id) in the thread
+        return await loop.run_in_executor(self._executor, contextvars.copy_context().run, call)
+
+    # --- Dispatch ---
+
+    def _next_job(self) -> Optional[ExtractionJob]:
+        for level in sorted(self._queues):
+            tenants = self._queues[level]
+            while tenants:
+                tenant = min(tenants, key=lambda t: self._tenant_vtime.get(t, 0.0))
+                heap = tenants[tenant]
+                _, _, job = heapq.heappop(heap)
+                if not heap:
+                    del tenants[tenant]
+                if job.cancelled:
+                    continue
+
+                self._global_vtime = self._tenant_vtime.get(tenant, 0.0)
+                self._tenant_vtime[tenant] = self._global_vtime + job.cost
+                return job
+        return None
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self.max_concurrent:
+            job = self._next_job()
+            if job is None:
+                return
+
+            self._queued.pop(job.task_id, None)
+            self._running[job.task_id] = job
+            waited = time.monotonic() - job.submitted_at
+            scheduler_logger.info(f"Starting {job} after {waited:.1f}s in queue.")
+
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: ExtractionJob) -> None:
+        try:
+            await job.runner(job)
+        except Exception as e:
+            scheduler_logger.exception(f"Unhandled error while running {job}: {e}")
+        finally:
+            self._running.pop(job.task_id, None)
+            self._dispatch()
+
+
+# --- Worker Process Execution ---
+
+def _kill(process) -> None:
+    if process is not None and process.is_alive():
+        process.kill()
+
+
+def _process_entry(conn, target: Callable[..., Any], kwargs: dict) -> None:
+    try:
+        conn.send(('ok', target(**kwargs)))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_in_worker_process(job: ExtractionJob, target: Callable[..., Any], kwargs: dict,
+                          timeout: float = EXTRACTION_TIMEOUT_SECONDS,
+                          should_cancel: Optional[Callable[[], bool]] = None) -> Any:
+    """
+    Runs target(**kwargs) in a separate process and returns its result. Blocking. The
+    process is killed when the timeout elapses or the job is cancelled, which is the only
+    reliable way to stop a stuck Camelot/Ghostscript call.
+
+    target must be a module-level function; the 'spawn' start method is used because
+    forking a process that runs an event loop and thread pools is unsafe.
+    Inside the API use ExtractionScheduler.run_in_worker, which waits on dedicated threads.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_process_entry, args=(sender, target, kwargs), daemon=True)
+    process.start()
+    sender.close()
+    job.process = process
+
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            if job.cancelled:
+                _kill(process)
+                raise ExtractionCancelled(f"Task {job.task_id} was cancelled.")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _kill(process)
+                raise ExtractionTimeout(f"Extraction exceeded {timeout:.0f}s and was terminated.")
+
+            if receiver.poll(min(remaining, CANCEL_POLL_SECONDS)):
+                try:
+                    status, payload = receiver.recv()
+                except EOFError:
+                    # Pipe closed without a result: the worker was killed or crashed
+                    if job.cancelled:
+                        raise ExtractionCancelled(f"Task {job.task_id} was cancelled.")
+                    raise Exception(f"Extraction worker exited unexpectedly (exit code {process.exitcode}).")
+
+                if status == 'error':
+                    raise Exception(payload)
+                return payload
+
+            if should_cancel is not None and should_cancel():
+                job.cancelled = True
+    finally:
+        # Give a finished worker a moment to exit cleanly before killing it
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        receiver.close()
+        job.process = None
+
+
+# --- Process-wide Scheduler Instance ---
+
+_scheduler: Optional[ExtractionScheduler] = None
+
+
+def get_scheduler() -> ExtractionScheduler:
+    """Returns the scheduler of this API process, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ExtractionScheduler()
+    return _scheduler
@@ -0,0 +1,202 @@
+import asyncio
+from typing import List, Optional
+from backend.db.connection import sessionlocal, get_sessionmaker
+from backend.db.models import TableRowIndexTable
+from backend.logger.log_utils import setup_logger
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, func, or_, text
+
+search_logger = setup_logger(name="search_service")
+
+MAX_PAGE_SIZE = 200
+INSERT_BATCH_SIZE = 1000
+CELL_SEPARATOR = ' | '
+# Trigrams need three characters; shorter ILIKE patterns cannot use the trigram index
+TRIGRAM_MIN_QUERY_LENGTH = 3
+
+
+def _like_pattern(text: str) -> str:
+    """Builds an ILIKE substring pattern, escaping LIKE wildcards in the user text."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+# Whether the trigram index exists; checked once per process (None = not checked yet)
+_trigram_available: Optional[bool] = None
+
+
+def _has_trigram(db: Session) -> bool:
+    """
+    Whether init_db created the trigram index (which implies pg_trgm is installed). It may
+    not have been allowed to; substring matching and word_similarity are skipped then.
+    """
+    global _trigram_available
+    if _trigram_available is None:
+        try:
+            _trigram_available = db.execute(
+                text("SELECT 1 FROM pg_indexes WHERE schemaname = current_schema() "
+                     "AND indexname = 'ix_TableRowIndex_content_trgm'")).first() is not None
+        except Exception as e:
+            db.rollback()
+            search_logger.warning(f'Could not check for the trigram index, using full-text matching only: {e}')
+            return False
+        if not _trigram_available:
+            search_logger.warning('Trigram index is missing; using full-text matching and rank only.')
+    return _trigram_available
+
+
+def _cell_text(value) -> str:
+    # value != value filters NaN without importing pandas/numpy here
+    if value is None or value != value:
+        return ''
+    return str(value).strip()
+
+
+class SearchServices:
+    """
+    Maintains the row-level full-text index over extracted tables and serves ranked searches.
+    """
+
+    # --- Index Writes (Executed in the extraction worker) ---
+
+    def index_table(self, table_name: str, document_id: str, task_id: str, df) -> int:
+        """
+        Replaces the index rows of a table with one entry per DataFrame row.
+
+        Returns:
+            int: The number of rows indexed.
+        """
+        # Runs in the extraction worker, so it uses the extraction pool
+        db: Session = get_sessionmaker("extraction")()
+        indexed = 0
+
+        try:
+            db.execute(delete(TableRowIndexTable).where(TableRowIndexTable.table_name == table_name))
+
+            batch = []
+            for row_number, values in enumerate(df.itertuples(index=False, name=None), start=1):
+                content = CELL_SEPARATOR.join(t for t in map(_cell_text, values) if t)
+                if not content:
+                    continue
+
+                batch.append({
+                    'table_name': table_name,
+                    'docID': document_id,
+                    'taskID': task_id,
+                    'row_number': row_number,
+                    'content': content,
+                })
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    db.execute(insert(TableRowIndexTable), batch)
+                    indexed += len(batch)
+                    batch = []
+
+            if batch:
+                db.execute(insert(TableRowIndexTable), batch)
+                indexed += len(batch)
+
+            db.commit()
+            return indexed
+
+        except Exception:
+            db.rollback()
+            search_logger.exception(f'Failed to index table {table_name}.')
+            raise
+        finally:
+            db.close()
+
+    # --- Search (Executed on API POST /search) ---
+
+    @staticmethod
+    def _match_clause(db: Session, query: str):
+        """
+        Full-text match, plus substring (ILIKE) match when the trigram index can serve it:
+        pg_trgm installed and at least TRIGRAM_MIN_QUERY_LENGTH characters. Otherwise ILIKE
+        would scan every indexed row.
+        """
+        tsquery = func.websearch_to_tsquery('simple', query)
+        condition = TableRowIndexTable.search_vector.op('@@')(tsquery)
+        if len(query) >= TRIGRAM_MIN_QUERY_LENGTH and _has_trigram(db):
+            condition = or_(condition, TableRowIndexTable.content.ilike(_like_pattern(query)))
+        return tsquery, condition
+
+    async def search(self, query: str, document_id: Optional[str] = None, page: int = 1,
+                     page_size: int = 20) -> dict:
+        """
+        Returns one page of matching rows ranked by full-text rank plus trigram word similarity
+        (full-text rank only without the trigram index). has_more is reported instead of a
+        total count so deep result sets stay cheap.
+        """
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+
+        def _query() -> dict:
+            db: Session = sessionlocal()
+            try:
+                tsquery, condition = self._match_clause(db, query)
+                rank = func.ts_rank_cd(TableRowIndexTable.search_vector, tsquery)
+                if _has_trigram(db):
+                    rank = rank + func.word_similarity(query, TableRowIndexTable.content)
+                rank = rank.label('rank')
+
+                q = db.query(
+                    TableRowIndexTable.table_name,
+                    TableRowIndexTable.docID,
+                    TableRowIndexTable.taskID,
+                    TableRowIndexTable.row_number,
+                    TableRowIndexTable.content,
+                    rank,
+                ).filter(condition)
+                if document_id:
+                    q = q.filter(TableRowIndexTable.docID == document_id)
+
+                rows = (q.order_by(rank.desc(), TableRowIndexTable.id)
+                        .offset((page - 1) * page_size)
+                        .limit(page_size + 1)
+                        .all())
+
+                return {
+                    'items': [
+                        {
+                            'table_name': r.table_name,
+                            'document_id': r.docID,
+                            'task_id': r.taskID,
+                            'row_number': r.row_number,
+                            'content': r.content,
+                            'rank': float(r.rank or 0.0),
+                        }
+                        for r in rows[:page_size]
+                    ],
+                    'page': page,
+                    'page_size': page_size,
+                    'has_more': len(rows) > page_size,
+                }
+            finally:
+                db.close()
+
+        try:
+            return await asyncio.to_thread(_query)
+        except Exception as e:
+            search_logger.exception(f'SearchServices search error: {e}')
+            raise
+
+    async def matching_tables(self, query: str, table_names: List[str]) -> List[str]:
+        """Returns the subset of table_names that have at least one row matching the query."""
+        if not table_names:
+            return []
+
+        def _query() -> List[str]:
+            db: Session = sessionlocal()
+            try:
+                _, condition = self._match_clause(db, query)
+                rows = (db.query(TableRowIndexTable.table_name)
+                        .filter(condition, TableRowIndexTable.table_name.in_(table_names))
+                        .distinct()
+                        .all())
+                matched = {r[0] for r in rows}
+                # Preserve the caller's ordering
+                return [name for name in table_names if name in matched]
+            finally:
+                db.close()
+
+        return await asyncio.to_thread(_query)
@@ -1,23 +1,58 @@
 import camelot
 import pandas as pd
 from sqlalchemy.engine import Engine
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
 import os
+import logging
+from backend.logger.log_utils import setup_logger
 
+# Called once per exported table with (table_name, dataframe, table_metadata)
+TableExportedHook = Callable[[str, pd.DataFrame, Dict[str, Any]], None]
 
-def extract_logger(message):
-    print(f"[EXTRACT] {message}")
+table_logger = setup_logger(name="table_extract")
 
 
-def table_extracter(pdf_file_path: str, doc_id: str, db_engine: Engine) -> List[str]:
+def extract_logger(message, level=logging.INFO, rate_key=None):
+    """
+    Logs an extraction message. Per-table messages pass a rate_key so large
+    documents cannot flood the log (see RateLimitFilter).
+    """
+    table_logger.log(level, message, extra={"rate_key": rate_key} if rate_key else None)
+
+
+def _table_metadata(table, flavor: str, index: int) -> Dict[str, Any]:
+    """Collects page and parsing-report details for a Camelot table."""
+    report = getattr(table, 'parsing_report', None) or {}
+    try:
+        page_number = int(report.get('page', getattr(table, 'page', None)))
+    except (TypeError, ValueError):
+        page_number = None
+
+    accuracy = report.get('accuracy')
+    whitespace = report.get('whitespace')
+
+    return {
+        'table_index': index,
+        'page_number': page_number,
+        'flavor': flavor,
+        'accuracy': float(accuracy) if accuracy is not None else None,
+        'whitespace': float(whitespace) if whitespace is not None else None,
+    }
+
+
+def table_extracter(pdf_file_path: str, doc_id: str, db_engine: Engine,
+                    on_table_exported: Optional[TableExportedHook] = None) -> List[str]:
     """
     Extracts tables from a PDF using Camelot and exports them to the database,
     trying aggressively optimized 'lattice' and 'stream' configurations.
+
+    If on_table_exported is given it is called after each table is written, e.g. to
+    record the table in the catalog. Hook failures are logged and do not abort extraction.
     """
     created_table_names: List[str] = []
 
     if not os.path.exists(pdf_file_path):
-        extract_logger(f"Error: PDF file not found at path: {pdf_file_path}")
+        extract_logger(f"Error: PDF file not found at path: {pdf_file_path}", level=logging.ERROR)
         return created_table_names
 
     extract_logger(f"Starting table extraction for Document ID: {doc_id}")
@@ -71,13 +106,22 @@ def table_extracter(pdf_file_path: str, doc_id: str, db_engine: Engine) -> List[
                         method='multi'
                     )
                     created_table_names.append(target_table_name)
-                    extract_logger(f"Exported Table {j + 1} to DB table: {target_table_name}")
+                    extract_logger(f"Exported Table {j + 1} to DB table: {target_table_name}",
+                                   rate_key="extract.table_exported")
+
+                    if on_table_exported is not None:
+                        try:
+                            on_table_exported(target_table_name, df, _table_metadata(table, flavor, j + 1))
+                        except Exception as hook_e:
+                            extract_logger(f"Post-export hook failed for {target_table_name}: {hook_e}",
+                                           level=logging.ERROR, rate_key="extract.hook_failed")
 
                 return created_table_names
 
         except Exception as e:
-            extract_logger(f"Error during {flavor} extraction attempt: {e}")
+            extract_logger(f"Error during {flavor} extraction attempt: {e}", level=logging.WARNING)
             continue
 
-    extract_logger("\n Final attempt failed: No tables were extracted successfully using any configuration.")
+    extract_logger("Final attempt failed: No tables were extracted successfully using any configuration.",
+                   level=logging.WARNING)
     return created_table_names
\ No newline at end of file
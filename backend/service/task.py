@@ -1,14 +1,60 @@
 import asyncio
+from datetime import timedelta
+from typing import List, Tuple
 from backend.utils.util import get_unique_number, Response
-from backend.db.connection import sessionlocal, engine
+from backend.db.connection import sessionlocal, get_engine
 from backend.db.models import TaskTable, DocumentTable
-from backend.service.table_extract import table_extracter
-from backend.logger.log_utils import setup_logger
+from backend.service.catalog import CatalogServices
+from backend.service.search import SearchServices
+from backend.service.profile import ProfileServices
+from backend.service.scheduler import (get_scheduler, estimate_cost, ExtractionJob,
+                                       ExtractionCancelled, ExtractionTimeout, PRIORITY_CLASSES,
+                                       DEFAULT_PRIORITY, DEFAULT_TENANT, EXTRACTION_TIMEOUT_SECONDS)
+from backend.service.task_cache import task_status_cache
+from backend.logger.log_utils import setup_logger, bind_correlation_id
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func
 
 service_logger = setup_logger(name="task_service")
 
+# --- Task Status Constants ---
+STATUS_PENDING = 'PENDING'
+STATUS_IN_PROCESS = 'IN_PROCESS'
+STATUS_COMPLETED = 'COMPLETED'
+STATUS_FAILED = 'FAILED'
+STATUS_CANCELLED = 'CANCELLED'
+ACTIVE_STATUSES = (STATUS_PENDING, STATUS_IN_PROCESS)
+
+# Grace period on top of EXTRACTION_TIMEOUT_SECONDS before an IN_PROCESS task counts as abandoned
+STALE_TASK_MARGIN_SECONDS = 60
+
+
+def _extract_in_worker(pdf_path: str, doc_id: str, task_id: str) -> List[str]:
+    """
+    Extraction entry point executed inside the scheduler's worker process.
+    Writes the tables plus their catalog, search index and profile entries.
+    """
+    # Imported here so camelot/pandas/OpenCV load only in extraction workers, not API processes
+    from backend.service.table_extract import table_extracter
+
+    catalog = CatalogServices()
+    search = SearchServices()
+    profiles = ProfileServices()
+
+    def on_table_exported(name, df, meta):
+        catalog.record_table(name, doc_id, task_id, df, meta)
+        search.index_table(name, doc_id, task_id, df)
+        profiles.record_profile(name, doc_id, task_id, df)
+
+    with bind_correlation_id(task_id):
+        return table_extracter(
+            pdf_file_path=pdf_path,
+            doc_id=task_id,
+            db_engine=get_engine("extraction"),
+            on_table_exported=on_table_exported
+        )
+
 
 class TaskServices:
     """
@@ -18,11 +64,14 @@ class TaskServices:
 
     # --- Task Creation & Trigger (Executed on API POST /tasktrigger_task) ---
 
-    async def create(self, docID: str) -> Response:
+    async def create(self, docID: str, tenant: str = DEFAULT_TENANT, priority: str = DEFAULT_PRIORITY) -> Response:
         """
-        Creates a new task in the database and immediately triggers the
-        heavy lifting (PDF extraction) in a separate thread.
+        Creates a new task in the database and submits the heavy lifting
+        (PDF extraction) to the extraction scheduler.
         """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f'Unknown priority: {priority}. Expected one of {sorted(PRIORITY_CLASSES)}.')
+
         task_id = get_unique_number()
         db: Session = sessionlocal()
 
@@ -39,7 +88,9 @@ class TaskServices:
         new_task = TaskTable(
             id=task_id,
             docID=docID,
-            status='PENDING',
+            status=STATUS_PENDING,
+            tenant=tenant,
+            priority=priority,
             output={},
         )
 
@@ -49,16 +100,7 @@ class TaskServices:
             db.commit()
             db.refresh(new_task)
             service_logger.info(f"Task {task_id} created for Doc {docID}. Status: PENDING.")
-
-            # 3. Trigger asynchronous background processing
-            # We use asyncio.create_task to schedule the background work without blocking
-            # the return of this API call.
-            await asyncio.create_task(
-                self._run_extraction_in_background(task_id, doc.storage_path)
-            )
-
-            # 4. Return the new Task ID immediately
-            return Response(Id=task_id)
+            pdf_path = doc.storage_path
 
         except IntegrityError as e:
             db.rollback()
@@ -71,34 +113,189 @@ class TaskServices:
         finally:
             db.close()
 
-    # --- Background Extraction Daemon Logic (Runs in worker thread) ---
+        # 3. Queue the extraction. The scheduler orders it by priority, tenant share and
+        # estimated cost; this API call returns without waiting for it to start.
+        try:
+            await self._submit(task_id, docID, pdf_path, tenant, priority)
+        except Exception as e:
+            service_logger.exception(f'Could not queue extraction for task {task_id}.')
+            # The task is committed; don't leave it PENDING with nothing queued to run it
+            await asyncio.to_thread(self._mark_failed, task_id, f"Could not queue extraction: {e}")
+            raise Exception(f'Could not queue extraction for task {task_id}: {e}')
+
+        # 4. Return the new Task ID immediately
+        return Response(Id=task_id)
+
+    async def _submit(self, task_id: str, doc_id: str, pdf_path: str, tenant: str, priority: str) -> None:
+        cost = await asyncio.to_thread(estimate_cost, pdf_path)
+        get_scheduler().submit(ExtractionJob(
+            task_id=task_id,
+            tenant=tenant,
+            priority=priority,
+            cost=cost,
+            runner=lambda job: self._run_extraction_in_background(job, doc_id, pdf_path)
+        ))
+
+    @staticmethod
+    def _mark_failed(task_id: str, reason: str) -> None:
+        """Marks a pending task FAILED (used when it could not be queued)."""
+        db: Session = sessionlocal()
+        try:
+            db.query(TaskTable).filter(TaskTable.id == task_id, TaskTable.status == STATUS_PENDING).update({
+                'status': STATUS_FAILED,
+                'output': {"extracted_tables": [], "success": False, "reason": reason}
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            service_logger.error(f"Failed to update task {task_id} to FAILED state: {e}")
+        finally:
+            task_status_cache.invalidate(task_id)
+            db.close()
+
+    # --- Re-queue After Restart (Executed on API startup) ---
+
+    async def requeue_pending(self) -> int:
+        """
+        Queues the PENDING tasks found in the database. The scheduler queue is in memory, so
+        tasks queued before a restart are otherwise never run.
+
+        With several API workers each one re-queues every PENDING task; only one of them runs
+        it, as starting a task is a guarded PENDING -> IN_PROCESS update.
+
+        Returns:
+            int: The number of tasks queued.
+        """
+        def _pending() -> list:
+            db: Session = sessionlocal()
+            try:
+                return (db.query(TaskTable.id, TaskTable.docID, TaskTable.tenant, TaskTable.priority,
+                                 DocumentTable.storage_path)
+                        .join(DocumentTable, DocumentTable.id == TaskTable.docID)
+                        .filter(TaskTable.status == STATUS_PENDING)
+                        .order_by(TaskTable.created_ts)
+                        .all())
+            finally:
+                db.close()
+
+        queued = 0
+        for task_id, doc_id, tenant, priority, pdf_path in await asyncio.to_thread(_pending):
+            try:
+                await self._submit(task_id, doc_id, pdf_path, tenant,
+                                   priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY)
+                queued += 1
+            except Exception as e:
+                service_logger.exception(f'Could not re-queue task {task_id}.')
+                await asyncio.to_thread(self._mark_failed, task_id, f"Could not queue extraction: {e}")
+
+        if queued:
+            service_logger.info(f"Re-queued {queued} pending task(s) after startup.")
+        return queued
+
+    async def fail_stale_in_process(self) -> int:
+        """
+        Marks FAILED the IN_PROCESS tasks that have not been updated for longer than the
+        extraction timeout. Their API process died mid-extraction (a live one would have
+        killed the worker and recorded the timeout by then), so nothing will finish them.
+
+        Returns:
+            int: The number of tasks marked FAILED.
+        """
+        # A live process records a timeout within seconds; the margin keeps this from racing it
+        stale_after = timedelta(seconds=EXTRACTION_TIMEOUT_SECONDS + STALE_TASK_MARGIN_SECONDS)
+
+        def _fail_stale() -> int:
+            db: Session = sessionlocal()
+            try:
+                failed = db.query(TaskTable).filter(
+                    TaskTable.status == STATUS_IN_PROCESS,
+                    TaskTable.modified_ts < func.now() - stale_after
+                ).update({
+                    'status': STATUS_FAILED,
+                    'output': {"extracted_tables": [], "success": False,
+                               "reason": "Extraction was interrupted by a server restart."}
+                }, synchronize_session=False)
+                db.commit()
+                return failed
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+        failed = await asyncio.to_thread(_fail_stale)
+        if failed:
+            service_logger.warning(f"Marked {failed} interrupted IN_PROCESS task(s) as FAILED.")
+        return failed
+
+    # --- Background Extraction Logic (Dispatched by the extraction scheduler) ---
+
+    @staticmethod
+    def _is_cancelled(task_id: str) -> bool:
+        """Checks the DB for a cancellation made through another API worker process."""
+        db: Session = sessionlocal()
+        try:
+            status = db.query(TaskTable.status).filter(TaskTable.id == task_id).scalar()
+            return status == STATUS_CANCELLED
+        finally:
+            db.close()
 
-    async def _run_extraction_in_background(self, task_id: str, pdf_path: str):
+    async def _run_extraction_in_background(self, job: ExtractionJob, doc_id: str, pdf_path: str):
         """
         Manages the asynchronous execution and status update of the extraction.
         """
+        task_id = job.task_id
+        with bind_correlation_id(task_id):
+            await self._run_extraction(job, doc_id, pdf_path)
+
+    async def _run_extraction(self, job: ExtractionJob, doc_id: str, pdf_path: str):
+        task_id = job.task_id
         # Create a NEW session for this background thread
         db: Session = sessionlocal()
 
         try:
-            # 1. Update status to IN_PROCESS
+            # 1. Update status to IN_PROCESS, unless the task was cancelled while queued
             # synchronize_session=False is more efficient for updates where we don't need the object back immediately
-            db.query(TaskTable).filter(TaskTable.id == task_id).update({'status': 'IN_PROCESS'},
-                                                                       synchronize_session=False)
+            started = db.query(TaskTable).filter(
+                TaskTable.id == task_id, TaskTable.status == STATUS_PENDING
+            ).update({'status': STATUS_IN_PROCESS}, synchronize_session=False)
             db.commit()
+            task_status_cache.invalidate(task_id)
+            if not started:
+                service_logger.info(f"Task {task_id} is no longer pending; skipping extraction.")
+                return
             service_logger.info(f"Task {task_id} status updated to IN_PROCESS.")
 
-            # 2. Execute the synchronous extraction in a separate thread
-            # table_extracter is CPU/IO bound, so we run it in a thread pool to avoid blocking the async event loop
-            extracted_tables = await asyncio.to_thread(
-                table_extracter,
-                pdf_file_path=pdf_path,
-                doc_id=task_id,
-                db_engine=engine
-            )
+            # 2. Execute the extraction in a worker process (waited on from one of the scheduler's
+            # own threads so the event loop and the shared to_thread pool stay free). The process
+            # is killed on timeout or cancellation.
+            try:
+                extracted_tables = await get_scheduler().run_in_worker(
+                    job,
+                    _extract_in_worker,
+                    {'pdf_path': pdf_path, 'doc_id': doc_id, 'task_id': task_id},
+                    should_cancel=lambda: self._is_cancelled(task_id)
+                )
+            except ExtractionCancelled:
+                service_logger.info(f"Task {task_id} was cancelled during extraction.")
+                db.query(TaskTable).filter(TaskTable.id == task_id).update({
+                    'status': STATUS_CANCELLED,
+                    'output': {"extracted_tables": [], "success": False, "reason": "Task was cancelled."}
+                }, synchronize_session=False)
+                db.commit()
+                return
+            except ExtractionTimeout as e:
+                service_logger.error(f"Task {task_id} timed out: {e}")
+                # A cancellation that raced the timeout wins
+                db.query(TaskTable).filter(TaskTable.id == task_id, TaskTable.status != STATUS_CANCELLED).update({
+                    'status': STATUS_FAILED,
+                    'output': {"extracted_tables": [], "success": False, "reason": str(e)}
+                }, synchronize_session=False)
+                db.commit()
+                return
 
             # 3. Determine final status and output
-            final_status = 'COMPLETED' if extracted_tables else 'FAILED'
+            final_status = STATUS_COMPLETED if extracted_tables else STATUS_FAILED
             output_data = {
                 "extracted_tables": extracted_tables,
                 "success": bool(extracted_tables),
@@ -107,8 +304,8 @@ class TaskServices:
 
             service_logger.info(f"Task {task_id} finished. Status: {final_status}.")
 
-            # 4. Update final status and output
-            db.query(TaskTable).filter(TaskTable.id == task_id).update({
+            # 4. Update final status and output (a cancellation that raced the finish wins)
+            db.query(TaskTable).filter(TaskTable.id == task_id, TaskTable.status != STATUS_CANCELLED).update({
                 'status': final_status,
                 'output': output_data
             }, synchronize_session=False)
@@ -121,8 +318,8 @@ class TaskServices:
             # Attempt to save the error state to the DB
             try:
                 output_data = {"extracted_tables": [], "success": False, "reason": f"Critical server error: {str(e)}"}
-                db.query(TaskTable).filter(TaskTable.id == task_id).update({
-                    'status': 'FAILED',
+                db.query(TaskTable).filter(TaskTable.id == task_id, TaskTable.status != STATUS_CANCELLED).update({
+                    'status': STATUS_FAILED,
                     'output': output_data
                 }, synchronize_session=False)
                 db.commit()
@@ -130,14 +327,75 @@ class TaskServices:
                 service_logger.error(f"Failed to update task {task_id} to FAILED state: {db_e}")
 
         finally:
+            # Every exit path above may have written a new status
+            task_status_cache.invalidate(task_id)
             db.close()
 
+    # --- Task Cancel (Executed on API POST /taskcancel_task) ---
+
+    async def cancel(self, task_id: str) -> dict:
+        """
+        Cancels a pending or running task. Queued jobs are dropped from the scheduler and
+        running ones have their worker process killed.
+
+        Returns:
+            dict: The resulting status and whether this call cancelled the task.
+        """
+        get_scheduler().cancel(task_id)
+
+        def _mark_cancelled() -> dict:
+            db: Session = sessionlocal()
+            try:
+                updated = db.query(TaskTable).filter(
+                    TaskTable.id == task_id, TaskTable.status.in_(ACTIVE_STATUSES)
+                ).update({
+                    'status': STATUS_CANCELLED,
+                    'output': {"extracted_tables": [], "success": False, "reason": "Task was cancelled."}
+                }, synchronize_session=False)
+                db.commit()
+                task_status_cache.invalidate(task_id)
+
+                if updated:
+                    return {'status': STATUS_CANCELLED, 'cancelled': True}
+
+                status = db.query(TaskTable.status).filter(TaskTable.id == task_id).scalar()
+                if status is None:
+                    raise Exception(f'Task not found: {task_id}')
+                # Already finished: nothing to cancel
+                return {'status': status, 'cancelled': False}
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+        try:
+            result = await asyncio.to_thread(_mark_cancelled)
+            service_logger.info(f"Cancel requested for task {task_id}: {result}")
+            return result
+        except Exception as e:
+            if "Task not found" not in str(e):
+                service_logger.exception(f'TaskServices cancel error: {e}')
+            raise
+
     # --- Task Fetch (Executed on API POST /taskfetch_output) ---
 
     async def fetch(self, task_id: str) -> dict:
         """
         Fetches the current status and output for a given task ID.
         """
+        output_data, _ = await self.fetch_with_etag(task_id)
+        return output_data
+
+    async def fetch_with_etag(self, task_id: str) -> Tuple[dict, str]:
+        """
+        Fetches the status and output for a task together with its ETag. Served from the
+        in-process cache when possible, so repeated polls do not touch the database.
+        """
+        cached = task_status_cache.get(task_id)
+        if cached is not None:
+            return cached
+
         db: Session = sessionlocal()
 
         try:
@@ -154,7 +412,8 @@ class TaskServices:
                 'status': task.status,
                 'output': task.output,
             }
-            return output_data
+            etag = task_status_cache.put(task_id, output_data)
+            return output_data, etag
 
         except Exception as e:
             # Log only unexpected errors, not "not found"
@@ -162,4 +421,4 @@ class TaskServices:
                 service_logger.exception(f'TaskServices fetch error: {e}')
             raise
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Terminal tasks only change when retention removes them or their tables (in the daemon
+# process), so they are cached for minutes; in-flight ones only briefly
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED', 'CANCELLED')
+TASK_CACHE_MAX_ENTRIES = int(os.getenv('TASK_CACHE_MAX_ENTRIES', 10_000))
+TASK_CACHE_INFLIGHT_TTL_SECONDS = float(os.getenv('TASK_CACHE_INFLIGHT_TTL_SECONDS', 2))
+TASK_CACHE_TERMINAL_TTL_SECONDS = float(os.getenv('TASK_CACHE_TERMINAL_TTL_SECONDS', 5 * 60))
+
+
+def compute_etag(data: dict) -> str:
+    """Strong ETag over the canonical JSON of a task status payload."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return '"' + hashlib.sha1(canonical.encode('utf-8')).hexdigest() + '"'
+
+
+class TaskStatusCache:
+    """
+    In-process LRU cache of task status payloads and their ETags.
+
+    Entries for terminal tasks expire after a long TTL, in-flight tasks after a short one.
+    This process invalidates entries on its own status updates; the TTLs bound how stale an
+    entry can be when another process changed the task (e.g. retention deleting it).
+    """
+
+    def __init__(self, max_entries: int = TASK_CACHE_MAX_ENTRIES,
+                 inflight_ttl: float = TASK_CACHE_INFLIGHT_TTL_SECONDS,
+                 terminal_ttl: float = TASK_CACHE_TERMINAL_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.inflight_ttl = inflight_ttl
+        self.terminal_ttl = terminal_ttl
+        self._entries: "OrderedDict[str, Tuple[dict, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, task_id: str) -> Optional[Tuple[dict, str]]:
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is None:
+                return None
+            data, etag, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[task_id]
+                return None
+            self._entries.move_to_end(task_id)
+            return data, etag
+
+    def put(self, task_id: str, data: dict) -> str:
+        """Caches a payload and returns its ETag."""
+        etag = compute_etag(data)
+        terminal = data.get('status') in TERMINAL_STATUSES
+        expires_at = time.monotonic() + (self.terminal_ttl if terminal else self.inflight_ttl)
+
+        with self._lock:
+            self._entries[task_id] = (data, etag, expires_at)
+            self._entries.move_to_end(task_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def invalidate(self, task_id: str) -> None:
+        with self._lock:
+            self._entries.pop(task_id, None)
+
+
+# Process-wide instance shared by the task service and API
+task_status_cache = TaskStatusCache()
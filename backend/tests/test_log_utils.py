@@ -0,0 +1,46 @@
+import json
+import logging
+import queue
+import threading
+from backend.logger.log_utils import JsonFormatter, _NonBlockingQueueHandler
+
+
+def make_record(level, msg):
+    return logging.LogRecord('test', level, __file__, 1, msg, None, None)
+
+
+def full_handler(monkeypatch):
+    monkeypatch.setattr('backend.logger.log_utils.LOG_BLOCKING_PUT_SECONDS', 0.05)
+    q = queue.Queue(maxsize=1)
+    q.put_nowait(make_record(logging.INFO, 'filler'))
+    return q, _NonBlockingQueueHandler(q)
+
+
+# --- Full Queue ---
+
+def test_info_is_dropped_without_blocking(monkeypatch):
+    q, handler = full_handler(monkeypatch)
+    handler.emit(make_record(logging.INFO, 'lost'))
+    assert handler.dropped == 1
+
+
+def test_warning_waits_for_room(monkeypatch):
+    q, handler = full_handler(monkeypatch)
+    monkeypatch.setattr('backend.logger.log_utils.LOG_BLOCKING_PUT_SECONDS', 2)
+    threading.Timer(0.1, q.get_nowait).start()
+    handler.emit(make_record(logging.ERROR, 'kept'))
+    assert handler.dropped == 0
+    assert q.get_nowait().getMessage() == 'kept'
+
+
+def test_next_record_reports_drop_count(monkeypatch):
+    q, handler = full_handler(monkeypatch)
+    handler.emit(make_record(logging.INFO, 'lost 1'))
+    handler.emit(make_record(logging.WARNING, 'lost 2'))
+    q.get_nowait()
+
+    handler.emit(make_record(logging.INFO, 'after'))
+    entry = json.loads(JsonFormatter().format(q.get_nowait()))
+    assert entry['message'] == 'after'
+    assert entry['dropped'] == 2
+    assert handler.dropped == 0
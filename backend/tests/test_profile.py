@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+from backend.service.profile import ProfileServices
+
+TABLE = 'doc_table_1'
+
+
+@pytest.fixture
+def profiles():
+    df = pd.DataFrame({
+        'client': ['Alice', 'Bob', 'Carol', 'Dave'],
+        'amount': ['1,000.00', '$ 200', '(10)', '22.5'],
+        'unit_price': ['1', '2', '4', '8'],
+    })
+    return {TABLE: ProfileServices.compute_profile(df)}
+
+
+def answer(question, profiles):
+    return ProfileServices().answer_aggregate(question, [TABLE], profiles)
+
+
+# --- Profile Computation ---
+
+def test_numeric_profile_parses_printed_amounts(profiles):
+    amount = profiles[TABLE]['columns'][1]['numeric']
+    assert amount['sum'] == 1212.5
+    assert amount['min'] == -10
+    assert amount['max'] == 1000
+    assert amount['invalid'] == 0
+
+
+def test_dates_are_not_numeric():
+    profile = ProfileServices.compute_profile(pd.DataFrame({'date': ['2023-01-05', '2023-02-01']}))
+    assert profile['columns'][0]['numeric'] is None
+
+
+# --- Aggregate Fast Path: answered from profiles ---
+
+@pytest.mark.parametrize('question, expected', [
+    ('What is the total amount?', '**Total of `amount`:** 1,212.5'),
+    ('average amount', '**Average of `amount`:** 303.125'),
+    ('What is the lowest amount?', '**Minimum of `amount`:** -10'),
+    ('Show the maximum unit price', '**Maximum of `unit_price`:** 8'),
+    ('How many rows are there?', '**Row count:** 4'),
+    ('How many distinct client values?', '**Distinct values of `client`:** 4'),
+])
+def test_simple_aggregates_are_answered(profiles, question, expected):
+    assert answer(question, profiles).startswith(expected)
+
+
+# --- Aggregate Fast Path: falls back to the LLM ---
+
+@pytest.mark.parametrize('question', [
+    # Filter by a cell value
+    'What is the total amount owed to Bob?',
+    'total amount Bob',
+    # Asks for the row, not just the number
+    'Which client has the largest amount?',
+    'Who has the smallest amount?',
+    # Leftover words that are neither column, aggregate nor filler
+    'total amount in 2023',
+    'average amount per client',
+    'What is the total amount excluding refunds?',
+    # No aggregate, or more than one
+    'amount',
+    'What is the minimum and maximum amount?',
+    # Aggregate without a column
+    'What is the total?',
+])
+def test_other_questions_fall_back(profiles, question):
+    assert answer(question, profiles) is None
+
+
+def test_unprofiled_table_falls_back(profiles):
+    assert ProfileServices().answer_aggregate('total amount', [TABLE, 'other_table'], profiles) is None
+
+
+def test_sum_over_likely_total_row_falls_back():
+    df = pd.DataFrame({'amount': ['10', '20', '30', '60']})
+    profiles = {TABLE: ProfileServices.compute_profile(df)}
+    assert answer('total amount', profiles) is None
+
+
+# --- Invoices with summary rows ---
+
+@pytest.fixture
+def invoice():
+    df = pd.DataFrame({
+        'description': ['Widget', 'Gadget', 'Bolt', 'Nut', 'Washer', 'Spring', 'Subtotal', 'Tax (10%)', 'Total'],
+        'amount': ['50', '40', '30', '20', '40', '30', '210', '21', '231'],
+    })
+    return {TABLE: ProfileServices.compute_profile(df)}
+
+
+def test_summary_rows_are_detected_and_left_out_of_numeric_stats(invoice):
+    profile = invoice[TABLE]
+    assert profile['summary_rows'] == 3
+    amount = profile['columns'][1]['numeric']
+    assert amount['sum'] == 210
+    assert amount['max'] == 50
+    assert amount['count'] == 6
+
+
+@pytest.mark.parametrize('question', [
+    'What is the total amount?',
+    'What is the highest amount?',
+    'average amount',
+    'What is the lowest amount?',
+    'How many rows are there?',
+    'How many distinct description values?',
+])
+def test_tables_with_summary_rows_fall_back(invoice, question):
+    assert answer(question, invoice) is None
+
+
+def test_unlabelled_subtotal_row_falls_back():
+    # Subtotal and total rows without labels: each equals the sum of the values above it
+    df = pd.DataFrame({'amount': ['50', '40', '30', '120', '12', '132']})
+    profiles = {TABLE: ProfileServices.compute_profile(df)}
+    assert profiles[TABLE]['columns'][0]['numeric']['possible_total_row']
+    assert answer('total amount', profiles) is None
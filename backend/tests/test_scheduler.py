@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import backend.service.scheduler as scheduler
+from backend.service.scheduler import (ExtractionScheduler, ExtractionJob, ExtractionCancelled, ExtractionTimeout,
+                                       run_in_worker_process)
+
+
+def _sleep_and_return(seconds: float, value: str) -> str:
+    # Module-level so the spawned worker process can import it
+    time.sleep(seconds)
+    return value
+
+
+def _fail() -> None:
+    raise ValueError("boom")
+
+
+def run_order(submissions, max_concurrent=1):
+    """
+    Submits jobs while a blocker holds the only slot, then releases it and returns the order
+    in which the queued jobs ran. submissions: (task_id, tenant, priority, cost) tuples.
+    """
+    order = []
+
+    async def main():
+        sched = ExtractionScheduler(max_concurrent=max_concurrent)
+        release = asyncio.Event()
+
+        async def blocker(job):
+            await release.wait()
+
+        async def record(job):
+            order.append(job.task_id)
+
+        sched.submit(ExtractionJob('blocker', 'x', 'high', 0, blocker))
+        for task_id, tenant, priority, cost in submissions:
+            sched.submit(ExtractionJob(task_id, tenant, priority, cost, record))
+        release.set()
+        while sched.stats()['queued'] or sched.stats()['running']:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    return order
+
+
+# --- Dispatch Order ---
+
+def test_higher_priority_runs_first():
+    assert run_order([('low', 't', 'low', 1), ('normal', 't', 'normal', 1), ('high', 't', 'high', 1)]) == \
+        ['high', 'normal', 'low']
+
+
+def test_cheapest_job_first_within_a_tenant():
+    assert run_order([('big', 't', 'normal', 800), ('small', 't', 'normal', 1), ('mid', 't', 'normal', 20)]) == \
+        ['small', 'mid', 'big']
+
+
+def test_tenants_share_by_consumed_cost():
+    # Tenant a's batch does not starve tenant b: b runs after a's first job
+    order = run_order([('a1', 'a', 'normal', 10), ('a2', 'a', 'normal', 10), ('a3', 'a', 'normal', 10),
+                       ('b1', 'b', 'normal', 10)])
+    assert order.index('b1') == 1
+
+
+# --- Cancellation ---
+
+def test_cancel_queued_job_never_runs():
+    ran = []
+
+    async def main():
+        sched = ExtractionScheduler(max_concurrent=1)
+        release = asyncio.Event()
+
+        async def blocker(job):
+            await release.wait()
+
+        async def record(job):
+            ran.append(job.task_id)
+
+        sched.submit(ExtractionJob('blocker', 't', 'normal', 1, blocker))
+        sched.submit(ExtractionJob('queued', 't', 'normal', 1, record))
+        assert sched.cancel('queued') == 'queued'
+        assert sched.cancel('unknown') is None
+        assert sched.cancel('blocker') == 'running'
+        release.set()
+        while sched.stats()['running']:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert ran == []
+
+
+# --- Worker Processes ---
+
+def make_job():
+    return ExtractionJob('t1', 'tenant', 'normal', 1, runner=None)
+
+
+def test_worker_returns_result():
+    assert run_in_worker_process(make_job(), _sleep_and_return, {'seconds': 0, 'value': 'done'}) == 'done'
+
+
+def test_worker_error_is_raised():
+    with pytest.raises(Exception, match="ValueError: boom"):
+        run_in_worker_process(make_job(), _fail, {})
+
+
+def test_worker_is_killed_on_timeout():
+    job = make_job()
+    started = time.monotonic()
+    with pytest.raises(ExtractionTimeout):
+        run_in_worker_process(job, _sleep_and_return, {'seconds': 30, 'value': 'late'}, timeout=1)
+    assert time.monotonic() - started < 10
+
+
+def test_worker_is_killed_on_cancel(monkeypatch):
+    monkeypatch.setattr(scheduler, 'CANCEL_POLL_SECONDS', 0.1)
+    cancel = threading.Event()
+    threading.Timer(0.5, cancel.set).start()
+
+    with pytest.raises(ExtractionCancelled):
+        run_in_worker_process(make_job(), _sleep_and_return, {'seconds': 30, 'value': 'late'},
+                              should_cancel=cancel.is_set)
+
+
+def test_waiting_does_not_use_the_shared_thread_pool():
+    async def main():
+        # A one-thread default pool: it would be exhausted if waiting used asyncio.to_thread
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        sched = ExtractionScheduler(max_concurrent=1)
+        waiting = asyncio.ensure_future(
+            sched.run_in_worker(make_job(), _sleep_and_return, {'seconds': 2, 'value': 'done'}))
+        await asyncio.sleep(0.2)
+        assert await asyncio.wait_for(asyncio.to_thread(lambda: 'free'), timeout=1) == 'free'
+        return await waiting
+
+    assert asyncio.run(main()) == 'done'
@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response, FileResponse
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+from backend.logger.log_utils import setup_logger
+
+static_logger = setup_logger(name="static_files")
+
+# Files larger than this are served from disk (still with pre-built variants); the total caps the cache size
+MAX_CACHED_FILE_BYTES = int(os.getenv("STATIC_CACHE_MAX_FILE_BYTES", 2 * 1024 * 1024))
+MAX_CACHED_TOTAL_BYTES = int(os.getenv("STATIC_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Compressing tiny files saves nothing once headers are counted
+MIN_COMPRESS_BYTES = 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml",
+                      "image/svg+xml", "application/wasm", "application/manifest+json")
+# Vite emits content-hashed bundles as assets/<name>-<hash>.<ext>
+HASHED_ASSET_RE = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+# Preference order when the client accepts several encodings
+ENCODINGS = ("br", "gzip")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class _CachedAsset:
+    """An in-memory static file with its encoded variants and validators."""
+
+    def __init__(self, media_type: str, cache_control: str, variants: Dict[str, bytes]):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.variants = variants
+        digest = hashlib.sha1(variants["identity"]).hexdigest()[:20]
+        # One strong ETag per representation, as each encoding is a different byte sequence
+        self.etags = {encoding: f'"{digest}-{encoding}"' for encoding in variants}
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.variants.values())
+
+
+def _accepted_encodings(header: str) -> set:
+    """Parses Accept-Encoding, dropping codings explicitly refused with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that keeps the built frontend in memory with gzip/brotli variants.
+
+    Pre-built `<file>.gz` / `<file>.br` siblings are used when present; without a pre-built .gz,
+    a gzip variant is compressed once at load time (brotli is never compressed at runtime).
+    Hashed Vite assets get an immutable Cache-Control, everything else (index.html) is
+    revalidated with ETag / If-None-Match. Files not in the cache (too large) are served
+    from disk with the same Cache-Control and their pre-built siblings.
+    """
+
+    def __init__(self, *, directory: str, html: bool = False, **kwargs):
+        super().__init__(directory=directory, html=html, **kwargs)
+        self._assets: Dict[str, _CachedAsset] = {}
+        self._load(directory)
+
+    # --- Cache Loading ---
+
+    def _load(self, directory: str) -> None:
+        total = 0
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.endswith((".gz", ".br")):
+                    continue
+
+                full_path = os.path.join(root, filename)
+                key = os.path.relpath(full_path, directory).replace(os.sep, "/")
+                if os.path.getsize(full_path) > MAX_CACHED_FILE_BYTES:
+                    continue
+
+                asset = self._build_asset(key, full_path)
+                if total + asset.size > MAX_CACHED_TOTAL_BYTES:
+                    static_logger.warning(f"Static cache full; serving {key} and remaining files from disk.")
+                    return
+                self._assets[key] = asset
+                total += asset.size
+
+        static_logger.info(f"Cached {len(self._assets)} static files in memory ({total / 1024:.0f} KB incl. variants).")
+
+    @staticmethod
+    def _read(path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _build_asset(self, key: str, full_path: str) -> _CachedAsset:
+        body = self._read(full_path)
+        media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        variants = {"identity": body}
+
+        if len(body) >= MIN_COMPRESS_BYTES and media_type.startswith(COMPRESSIBLE_TYPES):
+            # Brotli only from pre-built files (see Dockerfile): quality 11 is too slow for worker startup
+            br_body = self._read(full_path + ".br")
+            gz_body = self._read(full_path + ".gz")
+            if gz_body is None:
+                gz_body = gzip.compress(body, compresslevel=9, mtime=0)
+
+            for encoding, encoded in (("br", br_body), ("gzip", gz_body)):
+                if encoded is not None and len(encoded) < len(body):
+                    variants[encoding] = encoded
+
+        return _CachedAsset(media_type, self._cache_control_for(key), variants)
+
+    # --- Serving ---
+
+    @staticmethod
+    def _cache_control_for(key: str) -> str:
+        return IMMUTABLE_CACHE_CONTROL if HASHED_ASSET_RE.match(key) else REVALIDATE_CACHE_CONTROL
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        """Disk fallback for uncached files: same caching headers, pre-built variant if accepted."""
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        full_path = str(full_path)
+        key = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+
+        path, encoding = full_path, "identity"
+        for candidate in ENCODINGS:
+            sibling = full_path + ENCODING_SUFFIXES[candidate]
+            if candidate in accepted and os.path.isfile(sibling):
+                path, encoding, stat_result = sibling, candidate, os.stat(sibling)
+                break
+
+        headers = {"Cache-Control": self._cache_control_for(key), "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        # The ETag comes from the served file's stat, so each variant gets its own
+        response = FileResponse(path, stat_result=stat_result, headers=headers,
+                                media_type=mimetypes.guess_type(key)[0] or "application/octet-stream")
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _lookup_cached(self, path: str, scope) -> Optional[_CachedAsset]:
+        key = path.replace(os.sep, "/").strip("/")
+        if key in ("", "."):
+            return self._assets.get("index.html") if self.html else None
+        asset = self._assets.get(key)
+        if asset is None and self.html and scope["path"].endswith("/"):
+            # Directory URL; without the trailing slash StaticFiles issues the redirect
+            asset = self._assets.get(f"{key}/index.html")
+        return asset
+
+    async def get_response(self, path: str, scope) -> Response:
+        asset = self._lookup_cached(path, scope) if scope["method"] in ("GET", "HEAD") else None
+        if asset is None:
+            return await super().get_response(path, scope)
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        accepted = _accepted_encodings(headers.get("accept-encoding", ""))
+        encoding = next((e for e in ENCODINGS if e in accepted and e in asset.variants), "identity")
+
+        response_headers = {
+            "ETag": asset.etags[encoding],
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or asset.etags[encoding] in if_none_match):
+            return Response(status_code=304, headers=response_headers)
+
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=response_headers)
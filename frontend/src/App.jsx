@@ -36,7 +36,8 @@ const StatusPill = ({ status }) => {
       IN_PROCESS: { icon: Loader2, text: 'Processing', color: 'text-indigo-700', bg: 'bg-indigo-50', border: 'border-indigo-200', animate: true },
       COMPLETED: { icon: CheckCircle2, text: 'Complete', color: 'text-teal-700', bg: 'bg-teal-50', border: 'border-teal-200' },
       ERROR: { icon: AlertCircle, text: 'Error', color: 'text-rose-700', bg: 'bg-rose-50', border: 'border-rose-200' },
-      FAILED: { icon: XCircle, text: 'Failed', color: 'text-rose-700', bg: 'bg-rose-50', border: 'border-rose-200' }
+      FAILED: { icon: XCircle, text: 'Failed', color: 'text-rose-700', bg: 'bg-rose-50', border: 'border-rose-200' },
+      CANCELLED: { icon: XCircle, text: 'Cancelled', color: 'text-gray-700', bg: 'bg-gray-50', border: 'border-gray-200' }
     };
 
     const config = configs[status] || configs.ERROR;
@@ -279,7 +280,7 @@ export default function App() {
 
       setTasks(prev => prev.map(t => t.taskId === taskId ? { ...t, status, output } : t));
 
-      if (status !== 'COMPLETED' && status !== 'FAILED') {
+      if (status !== 'COMPLETED' && status !== 'FAILED' && status !== 'CANCELLED') {
         setTimeout(() => fetchOutput(taskId), POLL_INTERVAL);
       }
     } catch (err) {